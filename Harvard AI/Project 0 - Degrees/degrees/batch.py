@@ -0,0 +1,262 @@
+import argparse
+import csv
+import functools
+import itertools
+import json
+import multiprocessing
+import sys
+import time
+
+import degrees
+
+# Columns written for each query in CSV output
+FIELDS = ["source", "target", "source_id", "target_id", "source_name",
+          "target_name", "source_match", "target_match", "status",
+          "degrees", "path", "seconds"]
+
+# Lowest score at which an unknown name is replaced by its closest match;
+# names the query starts score 0.99
+FUZZY_MIN_SCORE = 0.5
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Answer many degrees queries against one loaded graph."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("queries",
+                        help="CSV file of source,target pairs ('-' for stdin)")
+    parser.add_argument("--ids", action="store_true",
+                        help="queries hold person IDs instead of names")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="resolve unknown names to a close enough match")
+    parser.add_argument("--format", choices=["csv", "jsonl"], default="csv")
+    parser.add_argument("--output", help="file to write results to")
+    parser.add_argument("--search", choices=sorted(degrees.SEARCHES),
+                        default="bfs")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--no-snapshot", dest="snapshot",
+                        action="store_false")
+    parser.add_argument("--no-births", dest="births", action="store_false")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="number of processes answering queries")
+    parser.add_argument("--chunksize", type=int, default=64,
+                        help="queries sent to a worker at a time")
+    args = parser.parse_args()
+
+    print("Loading data...", file=sys.stderr)
+    stats = degrees.load_data(args.directory, compact=args.compact,
+                              snapshot=args.snapshot, fuzzy=args.fuzzy,
+                              births=args.births)
+    print("Data loaded.", stats, file=sys.stderr)
+
+    queries = read_queries(args.queries)
+    if args.workers > 1:
+        results = run_parallel(
+            queries, args.search, args.ids, args.workers, args.chunksize,
+            (args.directory, args.compact, args.snapshot, args.fuzzy,
+             args.births)
+        )
+    else:
+        results = run_queries(queries, degrees.SEARCHES[args.search],
+                              args.ids)
+    results = Throughput(results)
+
+    out = open(args.output, "w", newline="") if args.output else sys.stdout
+    try:
+        start = time.perf_counter()
+        count = write_results(results, out, args.format)
+        elapsed = time.perf_counter() - start
+    finally:
+        if args.output:
+            out.close()
+    print(f"{count} queries answered in {elapsed:.3f}s.", file=sys.stderr)
+    if elapsed > 0:
+        print(f"{count / elapsed:.1f} queries/s with {args.workers} "
+              f"worker(s), {results.seconds:.3f}s spent searching.",
+              file=sys.stderr)
+
+
+def read_queries(filename):
+    """
+    Yields (source, target) pairs from a two-column CSV file,
+    skipping blank lines and an optional source,target header.
+    """
+    f = sys.stdin if filename == "-" else open(filename, encoding="utf-8")
+    try:
+        for row in csv.reader(f):
+            if not row:
+                continue
+            if len(row) != 2:
+                raise ValueError(f"expected source,target but got {row}")
+            source, target = (value.strip() for value in row)
+            if (source.lower(), target.lower()) == ("source", "target"):
+                continue
+            yield source, target
+    finally:
+        if f is not sys.stdin:
+            f.close()
+
+
+def resolve(value, ids):
+    """
+    Returns (person_id, match) for a query value, where match is "exact",
+    or "fuzzy" if the value was replaced by a close name. Both are None if
+    the value is unknown or, for names, ambiguous.
+
+    If the data was loaded with fuzzy=True, an unknown name resolves to
+    its closest suggestion, as long as it scores at least FUZZY_MIN_SCORE.
+    """
+    if ids:
+        if value in degrees.people:
+            return value, "exact"
+        return None, None
+    person_id = degrees.person_id_for_name(value, interactive=False)
+    if person_id is not None:
+        return person_id, "exact"
+    if value.lower() not in degrees.names:
+        suggestions = degrees.suggest_names(value, limit=1,
+                                            min_score=FUZZY_MIN_SCORE)
+        if suggestions:
+            person_id = degrees.person_id_for_name(suggestions[0],
+                                                   interactive=False)
+            if person_id is not None:
+                return person_id, "fuzzy"
+    return None, None
+
+
+def run_queries(queries, search, ids=False):
+    """
+    Yields a result dictionary for each (source, target) query,
+    timing only the search itself.
+    """
+    for source, target in queries:
+        source_id, source_match = resolve(source, ids)
+        target_id, target_match = resolve(target, ids)
+        result = {
+            "source": source,
+            "target": target,
+            "source_id": source_id,
+            "target_id": target_id,
+            "source_name": None,
+            "target_name": None,
+            "source_match": source_match,
+            "target_match": target_match,
+            "status": "not found",
+            "degrees": None,
+            "path": None,
+            "seconds": None,
+        }
+        for side in ("source", "target"):
+            person_id = result[f"{side}_id"]
+            if person_id is not None:
+                result[f"{side}_name"] = degrees.people[person_id]["name"]
+        if result["source_id"] is not None and result["target_id"] is not None:
+            start = time.perf_counter()
+            path = search(result["source_id"], result["target_id"])
+            result["seconds"] = round(time.perf_counter() - start, 6)
+            if path is None:
+                result["status"] = "not connected"
+            else:
+                result["status"] = "connected"
+                result["degrees"] = len(path)
+                result["path"] = path
+        yield result
+
+
+def run_parallel(queries, search, ids=False, workers=None, chunksize=64,
+                 data=None):
+    """
+    Yields the same results as run_queries, in query order, answering the
+    queries across a pool of worker processes.
+
+    search is a key of degrees.SEARCHES. Where processes can be forked,
+    workers inherit the graph already loaded in this process, so it is never
+    pickled. Otherwise each worker loads it itself from data, a (directory,
+    compact, snapshot, fuzzy, births) tuple; with a compact snapshot the
+    workers then share its memory-mapped pages.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context("fork")
+        initializer, initargs = None, ()
+    else:
+        if data is None:
+            raise ValueError("workers that can't fork need data to load")
+        context = multiprocessing.get_context("spawn")
+        initializer, initargs = load_worker, data
+
+    task = functools.partial(solve_chunk, search, ids)
+    with context.Pool(workers, initializer, initargs) as pool:
+        for results in pool.imap(task, chunks(queries, chunksize)):
+            yield from results
+
+
+def load_worker(directory, compact, snapshot, fuzzy, births):
+    """
+    Loads the dataset into a freshly spawned worker process.
+    """
+    degrees.load_data(directory, compact=compact, snapshot=snapshot,
+                      fuzzy=fuzzy, births=births)
+
+
+def solve_chunk(search, ids, queries):
+    """
+    Answers a list of queries inside a worker process.
+    """
+    return list(run_queries(queries, degrees.SEARCHES[search], ids))
+
+
+def chunks(iterable, size):
+    """
+    Yields successive lists of up to size items from an iterable.
+    """
+    iterator = iter(iterable)
+    while True:
+        chunk = list(itertools.islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+class Throughput():
+    """
+    Passes results through while adding up the time spent searching.
+    """
+
+    def __init__(self, results):
+        self.results = results
+        self.seconds = 0
+
+    def __iter__(self):
+        for result in self.results:
+            if result["seconds"] is not None:
+                self.seconds += result["seconds"]
+            yield result
+
+
+def write_results(results, out, format):
+    """
+    Streams results to a file as CSV rows or JSON lines,
+    returning how many were written.
+    """
+    count = 0
+    if format == "csv":
+        writer = csv.DictWriter(out, fieldnames=FIELDS)
+        writer.writeheader()
+    for result in results:
+        if format == "csv":
+            row = dict(result)
+            if row["path"] is not None:
+                row["path"] = " ".join(
+                    f"{movie_id}:{person_id}"
+                    for movie_id, person_id in row["path"]
+                )
+            writer.writerow(row)
+        else:
+            out.write(json.dumps(result) + "\n")
+        count += 1
+    return count
+
+
+if __name__ == "__main__":
+    main()
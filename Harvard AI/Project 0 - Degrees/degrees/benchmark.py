@@ -0,0 +1,140 @@
+import argparse
+import functools
+import random
+import sys
+import time
+import tracemalloc
+
+import degrees
+from util import QueueFrontier, SearchStats, percentile
+
+# Search implementations that can be benchmarked, each called as
+# search(source, target, stats=stats)
+SEARCHES = {
+    "bfs": degrees.shortest_path,
+    "bfs-list": functools.partial(degrees.shortest_path,
+                                  frontier_class=QueueFrontier),
+    "bidirectional": degrees.bidirectional_shortest_path,
+    "cached": degrees.cached_shortest_path,
+}
+
+WORKLOADS = ("near", "far", "disconnected")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark the degrees search implementations."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--queries", type=int, default=100,
+                        help="queries per workload")
+    parser.add_argument("--searches", default="bfs,bidirectional,cached",
+                        help="comma-separated searches from: "
+                             + ", ".join(SEARCHES))
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--no-snapshot", dest="snapshot",
+                        action="store_false")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    searches = args.searches.split(",")
+    for search in searches:
+        if search not in SEARCHES:
+            sys.exit(f"Unknown search: {search}")
+
+    print("Loading data...")
+    print(degrees.load_data(args.directory, compact=args.compact,
+                            snapshot=args.snapshot, births=False))
+
+    workloads = make_workloads(args.queries, random.Random(args.seed))
+    print(f"{'workload':<13}{'search':<15}{'queries':>8}{'expanded':>10}"
+          f"{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+          f"{'peak KiB':>10}")
+    for workload in WORKLOADS:
+        for search in searches:
+            result = run_workload(SEARCHES[search], workloads[workload])
+            print(f"{workload:<13}{search:<15}{result['queries']:>8}"
+                  f"{result['expanded']:>10.0f}"
+                  f"{result['p50']:>9.2f}{result['p90']:>9.2f}"
+                  f"{result['p99']:>9.2f}{result['max']:>9.2f}"
+                  f"{result['peak'] / 1024:>10.0f}")
+
+
+def make_workloads(count, rng):
+    """
+    Returns up to count (source, target) pairs for each workload:
+    near pairs are one or two degrees apart, far pairs are as far apart as
+    the source's component allows, and disconnected pairs have no path.
+    """
+    person_ids = list(degrees.people)
+    workloads = {workload: [] for workload in WORKLOADS}
+    attempts = 0
+    while (attempts < 10 * count
+           and any(len(pairs) < count for pairs in workloads.values())):
+        attempts += 1
+        source = rng.choice(person_ids)
+        distances, _ = degrees.all_distances(source)
+
+        near = [person_id for person_id, distance in distances.items()
+                if 1 <= distance <= 2]
+        if near and len(workloads["near"]) < count:
+            workloads["near"].append((source, rng.choice(near)))
+
+        farthest = max(distances.values())
+        if farthest > 2 and len(workloads["far"]) < count:
+            far = [person_id for person_id, distance in distances.items()
+                   if distance == farthest]
+            workloads["far"].append((source, rng.choice(far)))
+
+        if (len(distances) < len(person_ids)
+                and len(workloads["disconnected"]) < count):
+            target = rng.choice(person_ids)
+            while target in distances:
+                target = rng.choice(person_ids)
+            workloads["disconnected"].append((source, target))
+    return workloads
+
+
+def run_workload(search, pairs):
+    """
+    Runs a search over every pair, returning the query count, mean people
+    expanded, latency percentiles and maximum in milliseconds, and peak
+    memory allocated by any one query in bytes.
+
+    Latencies are measured first, then memory in a second pass, as tracing
+    allocations slows the search down.
+    """
+    degrees.tree_cache.clear()
+    latencies = []
+    expanded = 0
+    for source, target in pairs:
+        stats = SearchStats()
+        start = time.perf_counter()
+        search(source, target, stats=stats)
+        latencies.append((time.perf_counter() - start) * 1000)
+        expanded += stats.expanded
+
+    degrees.tree_cache.clear()
+    peak = 0
+    tracemalloc.start()
+    for source, target in pairs:
+        before = tracemalloc.get_traced_memory()[0]
+        tracemalloc.reset_peak()
+        search(source, target)
+        peak = max(peak, tracemalloc.get_traced_memory()[1] - before)
+    tracemalloc.stop()
+
+    latencies.sort()
+    return {
+        "queries": len(pairs),
+        "expanded": expanded / len(pairs) if pairs else 0,
+        "p50": percentile(latencies, 50),
+        "p90": percentile(latencies, 90),
+        "p99": percentile(latencies, 99),
+        "max": latencies[-1] if latencies else 0,
+        "peak": peak,
+    }
+
+
+if __name__ == "__main__":
+    main()
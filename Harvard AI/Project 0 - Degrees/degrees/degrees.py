@@ -1,7 +1,12 @@
-import csv
+import argparse
 import sys
+from collections import deque
 
-from util import Node, StackFrontier, QueueFrontier
+from graph import CompactGraph, label_components
+from loader import LoadStats, read_pairs, read_rows
+from nameindex import NameIndex
+from snapshot import read_snapshot, write_snapshot
+from util import Node, IndexedQueueFrontier, LRUCache, SearchStats
 
 # Maps names to a set of corresponding person_ids
 names = {}
@@ -12,55 +17,157 @@ people = {}
 # Maps movie_ids to a dictionary of: title, year, stars (a set of person_ids)
 movies = {}
 
+# Integer-indexed adjacency used instead of the movies/stars sets above
+# when the data is loaded with compact=True
+graph = None
 
-def load_data(directory):
+# Maps person_ids to the label of their connected component, and labels to
+# component sizes, when the data is not compact (CompactGraph keeps its own)
+components = {}
+component_sizes = []
+
+# Typo-tolerant index over the keys of names, when loaded with fuzzy=True
+name_index = None
+
+# Parent links of the breadth-first trees of recently searched sources,
+# used by cached_shortest_path, holding at most this many people in total
+TREE_CACHE_PEOPLE = 2 * 10 ** 6
+tree_cache = LRUCache(maxsize=TREE_CACHE_PEOPLE, size=len)
+
+
+def load_data(directory, compact=False, snapshot=True, fuzzy=False,
+              births=True):
+    """
+    Load data from CSV files into memory, returning LoadStats.
+
+    The CSV files are streamed in chunks of plain tuples. With births=False
+    the birth column is skipped and every birth is left empty.
+
+    With compact=True, the people and movies dictionaries keep only names,
+    births, titles and years, and the links between them are stored in a
+    CompactGraph instead of sets of IDs.
+
+    Compact loads also keep a binary snapshot next to the CSV files, which
+    is reused while the CSV files are unchanged, unless snapshot=False.
+
+    With fuzzy=True, a NameIndex is built so that suggest_names can offer
+    close matches for misspelled names.
     """
-    Load data from CSV files into memory.
+    global name_index
+
+    stats = LoadStats()
+
+    # Cached trees describe the previously loaded data
+    tree_cache.clear()
+
+    source = load_tables(directory, compact, snapshot, births)
+    name_index = NameIndex(names) if fuzzy else None
+    return stats.finish(source)
+
+
+def load_tables(directory, compact, snapshot, births):
     """
+    Loads people, movies and stars, from the snapshot if possible.
+    Returns where they were loaded from.
+    """
+    global graph
+
+    if compact and snapshot:
+        loaded = read_snapshot(directory, births)
+        if loaded is not None:
+            loaded_people, loaded_movies, graph = loaded
+            people.update(loaded_people)
+            movies.update(loaded_movies)
+            for person_id, person in loaded_people.items():
+                names.setdefault(person["name"].lower(), set()).add(person_id)
+            return "snapshot"
+
     # Load people
-    with open(f"{directory}/people.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            people[row["id"]] = {
-                "name": row["name"],
-                "birth": row["birth"],
-                "movies": set()
-            }
-            if row["name"].lower() not in names:
-                names[row["name"].lower()] = {row["id"]}
+    columns = ("id", "name", "birth") if births else ("id", "name")
+    for chunk in read_rows(f"{directory}/people.csv", columns):
+        for row in chunk:
+            person_id, name = row[0], row[1]
+            person = {"name": name, "birth": row[2] if births else ""}
+            if not compact:
+                person["movies"] = set()
+            people[person_id] = person
+            key = name.lower()
+            if key not in names:
+                names[key] = {person_id}
             else:
-                names[row["name"].lower()].add(row["id"])
+                names[key].add(person_id)
 
     # Load movies
-    with open(f"{directory}/movies.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            movies[row["id"]] = {
-                "title": row["title"],
-                "year": row["year"],
-                "stars": set()
-            }
+    for chunk in read_rows(f"{directory}/movies.csv", ("id", "title", "year")):
+        for movie_id, title, year in chunk:
+            movie = {"title": title, "year": year}
+            if not compact:
+                movie["stars"] = set()
+            movies[movie_id] = movie
 
     # Load stars
-    with open(f"{directory}/stars.csv", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            try:
-                people[row["person_id"]]["movies"].add(row["movie_id"])
-                movies[row["movie_id"]]["stars"].add(row["person_id"])
-            except KeyError:
-                pass
+    stars = read_pairs(f"{directory}/stars.csv", "person_id", "movie_id")
+    if compact:
+        graph = CompactGraph.from_stars(list(people), list(movies), stars)
+        if snapshot:
+            write_snapshot(directory, people, movies, graph, births)
+        return "csv"
+    graph = None
+    for person_id, movie_id in stars:
+        try:
+            people[person_id]["movies"].add(movie_id)
+            movies[movie_id]["stars"].add(person_id)
+        except KeyError:
+            pass
+
+    # Labelling connected components so disconnected pairs are answered
+    # without searching
+    index = {person_id: i for i, person_id in enumerate(people)}
+    labels, sizes = label_components(
+        len(index),
+        ([index[person_id] for person_id in movie["stars"]]
+         for movie in movies.values())
+    )
+    components.clear()
+    components.update(zip(index, labels))
+    component_sizes[:] = sizes
+    return "csv"
 
 
 def main():
-    if len(sys.argv) > 2:
-        sys.exit("Usage: python degrees.py [directory]")
-    directory = sys.argv[1] if len(sys.argv) == 2 else "large"
+    parser = argparse.ArgumentParser(
+        usage="python degrees.py [directory] [options]"
+    )
+    parser.add_argument("directory", nargs="?", default="large")
+    parser.add_argument("--search", choices=sorted(SEARCHES), default="bfs",
+                        help="search algorithm used to connect the two people")
+    parser.add_argument("--compact", action="store_true",
+                        help="store the graph as integer-indexed arrays")
+    parser.add_argument("--no-snapshot", dest="snapshot",
+                        action="store_false",
+                        help="don't read or write the compact graph snapshot")
+    parser.add_argument("--fuzzy", action="store_true",
+                        help="suggest close matches for unknown names")
+    parser.add_argument("--no-births", dest="births", action="store_false",
+                        help="skip birth years to save memory")
+    parser.add_argument("--stats", action="store_true",
+                        help="report load time and peak memory")
+    parser.add_argument("--within", type=int, metavar="N",
+                        help="only look for connections of up to N degrees")
+    parser.add_argument("--paths", type=int, metavar="K",
+                        help="list up to K different connections of the "
+                        "shortest length")
+    args = parser.parse_args()
+    search = SEARCHES[args.search]
 
     # Load data from files into memory
     print("Loading data...")
-    load_data(directory)
+    stats = load_data(args.directory, compact=args.compact,
+                      snapshot=args.snapshot, fuzzy=args.fuzzy,
+                      births=args.births)
     print("Data loaded.")
+    if args.stats:
+        print(stats)
 
     source = person_id_for_name(input("Name: "))
     if source is None:
@@ -69,30 +176,75 @@ def main():
     if target is None:
         sys.exit("Person not found.")
 
-    path = shortest_path(source, target)
-
-    if path is None:
-        print("Not connected.")
+    stats = SearchStats()
+    if args.paths is not None:
+        paths = k_shortest_paths(source, target, args.paths, stats=stats)
+    elif args.within is not None:
+        path = within_degrees(source, target, args.within, stats=stats)
+        paths = [] if path is None else [path]
     else:
-        degrees = len(path)
-        print(f"{degrees} degrees of separation.")
-        path = [(None, source)] + path
-        for i in range(degrees):
-            person1 = people[path[i][1]]["name"]
-            person2 = people[path[i + 1][1]]["name"]
-            movie = movies[path[i + 1][0]]["title"]
-            print(f"{i + 1}: {person1} and {person2} starred in {movie}")
-
-
-def shortest_path(source, target):
+        path = search(source, target)
+        paths = [] if path is None else [path]
+
+    if not paths:
+        if args.within is not None and connected(source, target):
+            print(f"Not connected within {args.within} degrees.")
+        else:
+            print("Not connected.")
+            for person_id in (source, target):
+                name = people[person_id]["name"]
+                size = component_size(person_id)
+                noun = "person" if size == 1 else "people"
+                print(f"{name}'s connected component has {size} {noun}.")
+    for number, path in enumerate(paths, 1):
+        if len(paths) > 1:
+            print(f"Connection {number}:")
+        print_path(source, path)
+    if args.paths is not None or args.within is not None:
+        print(f"{stats.expanded} people expanded.")
+
+
+def print_path(source, path):
+    """
+    Prints each step of a path of (movie_id, person_id) pairs.
+    """
+    degrees = len(path)
+    print(f"{degrees} degrees of separation.")
+    path = [(None, source)] + path
+    for i in range(degrees):
+        person1 = people[path[i][1]]["name"]
+        person2 = people[path[i + 1][1]]["name"]
+        movie = movies[path[i + 1][0]]["title"]
+        print(f"{i + 1}: {person1} and {person2} starred in {movie}")
+
+
+def shortest_path(source, target, frontier_class=IndexedQueueFrontier,
+                  stats=None):
     """
     Returns the shortest list of (movie_id, person_id) pairs
     that connect the source to the target.
 
     If no possible path, returns None.
 
+    The frontier class can be swapped, e.g. for util.QueueFrontier, to compare
+    against the list-backed frontier. A SearchStats passed as stats counts
+    the people the search expands.
+
     If the source equals to the target, then the shortest path is of length 0.
     """
+    return on_loaded_graph(
+        breadth_first_search, source, target, frontier_class, stats=stats
+    )
+
+
+def breadth_first_search(source, target, neighbors, frontier_class,
+                         limit=None):
+    """
+    Returns the shortest list of (action, state) pairs from the source to the
+    target, expanding states with the given neighbors function.
+
+    If no possible path, or none of at most limit steps, returns None.
+    """
 
     if source == target:
         return []
@@ -102,7 +254,7 @@ def shortest_path(source, target):
     goal = target
 
     # Breadth-first search is used to find the shortest path.
-    frontier = QueueFrontier()
+    frontier = frontier_class()
     frontier.add(start)
 
     # Initializing an empty explored set
@@ -118,11 +270,15 @@ def shortest_path(source, target):
         # Choosing a node from the frontier
         node = frontier.remove()
 
+        # Nodes leave the queue in depth order, so the rest are too deep
+        if limit is not None and node.depth >= limit:
+            return None
+
         # Marking node as explored
         explored.add(node.state)
 
         # Adding neighbors to frontier
-        for action, state in neighbors_for_person(node.state):
+        for action, state in neighbors(node.state):
             if not frontier.contains_state(state) and state not in explored:
                 child = Node(state=state, parent=node, action=action)
 
@@ -138,15 +294,376 @@ def shortest_path(source, target):
                 frontier.add(child)
 
 
-def person_id_for_name(name):
+def within_degrees(source, target, degrees, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs that connect the
+    source to the target if it has at most the given number of degrees,
+    otherwise None.
+
+    The search stops once every person within that many degrees of the
+    source has been reached.
+    """
+    return on_loaded_graph(
+        breadth_first_search, source, target, IndexedQueueFrontier, degrees,
+        stats=stats
+    )
+
+
+def k_shortest_paths(source, target, k, stats=None):
+    """
+    Returns up to k different shortest lists of (movie_id, person_id) pairs
+    that connect the source to the target, e.g. through different movies
+    or different people. If no possible path, returns an empty list.
+
+    One breadth-first search records every way of reaching each person in
+    the fewest steps, and the paths are then read off those links, so
+    alternate paths cost no extra searching.
+    """
+    return on_loaded_graph(
+        all_shortest_search, source, target, k, stats=stats, many=True
+    )
+
+
+def all_shortest_search(source, target, neighbors, k):
+    """
+    Returns up to k shortest lists of (action, state) pairs from the source
+    to the target, expanding states with the given neighbors function.
+    """
+
+    if source == target:
+        return [[]]
+
+    # Maps each reached state to its depth and to every (action, state)
+    # step one layer closer to the source
+    depths = {source: 0}
+    parents = {source: []}
+
+    frontier = IndexedQueueFrontier()
+    frontier.add(Node(state=source, parent=None, action=None))
+    goal_depth = None
+
+    while not frontier.empty():
+        node = frontier.remove()
+
+        # Once the goal is reached, only its own layer needs finishing
+        if goal_depth is not None and node.depth >= goal_depth:
+            break
+
+        for action, state in neighbors(node.state):
+            if state not in parents:
+                child = Node(state=state, parent=node, action=action)
+                parents[state] = [(action, node.state)]
+                if state == target:
+                    goal_depth = child.depth
+                elif goal_depth is None:
+                    frontier.add(child)
+                depths[state] = child.depth
+            elif depths[state] == node.depth + 1:
+                parents[state].append((action, node.state))
+
+    if target not in parents:
+        return []
+    return paths_from_parents(parents, target, k)
+
+
+def paths_from_parents(parents, target, k):
+    """
+    Returns up to k lists of (action, state) pairs leading to the target,
+    following the parent links recorded by all_shortest_search.
+    """
+    paths = []
+    stack = [(target, [])]
+    while stack and len(paths) < k:
+        state, path = stack.pop()
+        if not parents[state]:
+            paths.append(path)
+            continue
+        for action, parent in reversed(parents[state]):
+            stack.append((parent, [(action, state)] + path))
+    return paths
+
+
+def bidirectional_shortest_path(source, target, stats=None):
+    """
+    Returns the shortest list of (movie_id, person_id) pairs
+    that connect the source to the target, searching from both ends.
+
+    If no possible path, returns None.
+
+    Whole layers are expanded from whichever side has the smaller frontier,
+    so the two searches meet in the middle instead of one search covering
+    every person within the full distance of the source.
+    """
+    return on_loaded_graph(bidirectional_search, source, target, stats=stats)
+
+
+def bidirectional_search(source, target, neighbors):
+    """
+    Returns the shortest list of (action, state) pairs from the source to the
+    target, expanding states with the given neighbors function from both ends.
+
+    If no possible path, returns None.
+    """
+
+    if source == target:
+        return []
+
+    # Maps each reached person to the (movie_id, person_id) step towards
+    # the side's starting person.
+    forward = {source: None}
+    backward = {target: None}
+    forward_layer = [source]
+    backward_layer = [target]
+
+    while forward_layer and backward_layer:
+
+        # Expanding the smaller side keeps the total work balanced
+        if len(forward_layer) <= len(backward_layer):
+            forward_layer, meeting = expand_layer(
+                forward_layer, forward, backward, neighbors
+            )
+        else:
+            backward_layer, meeting = expand_layer(
+                backward_layer, backward, forward, neighbors
+            )
+
+        if meeting is not None:
+            return join_paths(meeting, forward, backward)
+
+    return None
+
+
+def expand_layer(layer, parents, other_parents, neighbors):
+    """
+    Expands every person in a layer of one side of a bidirectional search.
+
+    Returns the next layer and the person where the two sides meet, choosing
+    the meeting person that gives the shortest overall path, or None.
+    """
+    next_layer = []
+    meeting = None
+    best = None
+    for person_id in layer:
+        for movie_id, neighbor in neighbors(person_id):
+            if neighbor in parents:
+                continue
+            parents[neighbor] = (movie_id, person_id)
+            if neighbor in other_parents:
+                # The other side's distance decides which meeting is shortest
+                length = path_length(neighbor, other_parents)
+                if best is None or length < best:
+                    meeting, best = neighbor, length
+            next_layer.append(neighbor)
+    return next_layer, meeting
+
+
+def path_length(person_id, parents):
+    """
+    Returns how many steps separate a person from their side's start.
+    """
+    length = 0
+    while parents[person_id] is not None:
+        person_id = parents[person_id][1]
+        length += 1
+    return length
+
+
+def join_paths(meeting, forward, backward):
+    """
+    Joins the two halves of a bidirectional search at the meeting person
+    into a list of (movie_id, person_id) pairs from source to target.
+    """
+    solution = []
+    person_id = meeting
+    while forward[person_id] is not None:
+        movie_id, parent = forward[person_id]
+        solution.append((movie_id, person_id))
+        person_id = parent
+    solution.reverse()
+
+    person_id = meeting
+    while backward[person_id] is not None:
+        movie_id, person_id = backward[person_id]
+        solution.append((movie_id, person_id))
+    return solution
+
+
+def all_distances(source):
+    """
+    Runs one breadth-first search from the source and returns
+    (distances, parents) for every person reachable from it.
+
+    distances maps each person_id to its degrees of separation from the
+    source. parents maps each person_id to the (movie_id, person_id) step
+    back towards the source, or None for the source itself.
+    """
+    if graph is None:
+        parents = breadth_first_tree(source, neighbors_for_person)
+    else:
+        person_ids = graph.person_ids
+        movie_ids = graph.movie_ids
+        parents = {
+            person_ids[person]: None if step is None
+            else (movie_ids[step[0]], person_ids[step[1]])
+            for person, step in breadth_first_tree(
+                graph.person_index[source], graph.neighbors
+            ).items()
+        }
+
+    # People were reached in breadth-first order, so each parent's
+    # distance is known before its children's
+    distances = {}
+    for person_id, step in parents.items():
+        distances[person_id] = 0 if step is None else distances[step[1]] + 1
+    return distances, parents
+
+
+def breadth_first_tree(source, neighbors):
+    """
+    Returns a dictionary mapping every state reachable from the source to
+    the (action, state) step back towards it, or None for the source,
+    expanding states with the given neighbors function. States are added
+    in breadth-first order.
+    """
+    parents = {source: None}
+    queue = deque([source])
+    while queue:
+        state = queue.popleft()
+        for action, neighbor in neighbors(state):
+            if neighbor not in parents:
+                parents[neighbor] = (action, state)
+                queue.append(neighbor)
+    return parents
+
+
+def cached_shortest_path(source, target, stats=None):
+    """
+    Returns the same path length as shortest_path, reusing the breadth-first
+    tree of a recently searched source (or target) when there is one.
+
+    Repeated queries from one source, such as everyone's Bacon number,
+    then cost a single search plus a walk up the cached tree.
+    """
+    return on_loaded_graph(cached_search, source, target, stats=stats)
+
+
+def cached_search(source, target, neighbors):
+    """
+    Returns the shortest list of (action, state) pairs from the source to the
+    target using tree_cache, searching from the source on a miss.
+    """
+    parents = tree_cache.get(source)
+    if parents is None:
+
+        # The graph is undirected, so a tree from the target also answers
+        reverse = tree_cache.get(target)
+        if reverse is not None:
+            return reverse_path(path_from_tree(reverse, source), target)
+
+        parents = breadth_first_tree(source, neighbors)
+        tree_cache.put(source, parents)
+    return path_from_tree(parents, target)
+
+
+def path_from_tree(parents, target):
+    """
+    Returns the list of (action, state) pairs leading from the root of a
+    breadth-first tree to the target, or None if the target was not reached.
+    """
+    if target not in parents:
+        return None
+    solution = []
+    while parents[target] is not None:
+        action, parent = parents[target]
+        solution.append((action, target))
+        target = parent
+    solution.reverse()
+    return solution
+
+
+def reverse_path(path, start):
+    """
+    Reverses a list of (action, state) pairs leading away from the start,
+    returning the pairs that lead from its last state back to the start.
+    """
+    if path is None:
+        return None
+    states = [start] + [state for _, state in path]
+    return [(path[i][0], states[i]) for i in reversed(range(len(path)))]
+
+
+def on_loaded_graph(search, source, target, *args, stats=None, many=False):
+    """
+    Runs a search between two person_ids on whichever representation
+    load_data built, returning its path as (movie_id, person_id) pairs,
+    or with many=True, its list of such paths.
+
+    People in different connected components return None (or no paths)
+    without a search. If stats is given, it counts the people the search
+    expands.
+    """
+    neighbors = neighbors_for_person if graph is None else graph.neighbors
+    if stats is not None:
+        neighbors = stats.counting(neighbors)
+
+    if graph is None:
+        if components.get(source) != components.get(target):
+            return [] if many else None
+        return search(source, target, neighbors, *args)
+    source = graph.person_index[source]
+    target = graph.person_index[target]
+    if not graph.connected(source, target):
+        return [] if many else None
+    result = search(source, target, neighbors, *args)
+    if many:
+        return [graph.decode_path(path) for path in result]
+    return graph.decode_path(result)
+
+
+def connected(source, target):
+    """
+    Returns True if some path connects two people.
+    """
+    if graph is not None:
+        return graph.connected(graph.person_index[source],
+                               graph.person_index[target])
+    return components.get(source) == components.get(target)
+
+
+def component_size(person_id):
+    """
+    Returns how many people are in a person's connected component,
+    including the person.
+    """
+    if graph is not None:
+        person = graph.person_index[person_id]
+        return graph.component_sizes[graph.components[person]]
+    return component_sizes[components[person_id]]
+
+
+def person_id_for_name(name, interactive=True):
     """
     Returns the IMDB id for a person's name,
     resolving ambiguities as needed.
+
+    If interactive is False, ambiguous names return None
+    instead of asking which person was meant, and unknown names
+    return None instead of offering suggestions.
     """
     person_ids = list(names.get(name.lower(), set()))
     if len(person_ids) == 0:
+        suggestions = suggest_names(name) if interactive else []
+        if suggestions:
+            print(f"No '{name}'. Did you mean:")
+            for suggestion in suggestions:
+                print(f"    {suggestion}")
+            choice = input("Intended Name: ")
+            if choice.lower() in names:
+                return person_id_for_name(choice)
         return None
     elif len(person_ids) > 1:
+        if not interactive:
+            return None
         print(f"Which '{name}'?")
         for person_id in person_ids:
             person = people[person_id]
@@ -164,11 +681,32 @@ def person_id_for_name(name):
         return person_ids[0]
 
 
+def suggest_names(name, limit=5, min_score=0):
+    """
+    Returns up to limit known names closest to the given name, best first,
+    leaving out matches scoring below min_score (see NameIndex.search).
+
+    Suggestions need the data to be loaded with fuzzy=True;
+    otherwise there are none.
+    """
+    if name_index is None:
+        return []
+    suggestions = []
+    for key, score in name_index.search(name, limit):
+        if score < min_score:
+            break
+        person_id = next(iter(names[key]))
+        suggestions.append(people[person_id]["name"])
+    return suggestions
+
+
 def neighbors_for_person(person_id):
     """
     Returns (movie_id, person_id) pairs for people
     who starred with a given person.
     """
+    if graph is not None:
+        return graph.neighbors_for_person(person_id)
     movie_ids = people[person_id]["movies"]
     neighbors = set()
     for movie_id in movie_ids:
@@ -177,5 +715,13 @@ def neighbors_for_person(person_id):
     return neighbors
 
 
+# Search algorithms selectable from the command line
+SEARCHES = {
+    "bfs": shortest_path,
+    "bidirectional": bidirectional_shortest_path,
+    "cached": cached_shortest_path,
+}
+
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,92 @@
+import argparse
+import csv
+import itertools
+import os
+import random
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generate a synthetic people/movies/stars dataset."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--people", type=int, default=10000)
+    parser.add_argument("--movies", type=int, default=5000)
+    parser.add_argument("--cast", type=int, default=8,
+                        help="average number of stars per movie")
+    parser.add_argument("--distribution", choices=["uniform", "powerlaw"],
+                        default="powerlaw",
+                        help="how roles are shared out between people")
+    parser.add_argument("--exponent", type=float, default=1.0,
+                        help="power-law exponent of people's popularity")
+    parser.add_argument("--components", type=int, default=1,
+                        help="number of groups that never share a movie")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    generate(args.directory, args.people, args.movies, args.cast,
+             args.distribution, args.exponent, args.components, args.seed)
+    print(f"Wrote {args.people} people and {args.movies} movies "
+          f"to {args.directory}.")
+
+
+def generate(directory, people, movies, cast=8, distribution="powerlaw",
+             exponent=1.0, components=1, seed=0):
+    """
+    Writes people.csv, movies.csv and stars.csv to a directory.
+
+    People and movies are split into a number of groups whose movies only
+    cast their own people, so queries across groups are never connected.
+    Within a group, each movie casts on average `cast` people, chosen
+    uniformly or with popularity falling off as rank ** -exponent, which
+    gives the few very connected people real datasets have.
+    """
+    rng = random.Random(seed)
+    os.makedirs(directory, exist_ok=True)
+
+    with open(os.path.join(directory, "people.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth"])
+        for person in range(people):
+            writer.writerow([person, f"Person {person}",
+                             rng.randint(1900, 2010)])
+
+    with open(os.path.join(directory, "movies.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "title", "year"])
+        for movie in range(movies):
+            writer.writerow([movie, f"Movie {movie}",
+                             rng.randint(1920, 2020)])
+
+    with open(os.path.join(directory, "stars.csv"), "w",
+              encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["person_id", "movie_id"])
+        for group in range(components):
+            group_people = list(range(group, people, components))
+            if not group_people:
+                continue
+            weights = popularity(len(group_people), distribution, exponent)
+            for movie in range(group, movies, components):
+                size = min(len(group_people), rng.randint(1, 2 * cast - 1))
+                stars = set(rng.choices(group_people, cum_weights=weights,
+                                        k=size))
+                for person in sorted(stars):
+                    writer.writerow([person, movie])
+
+
+def popularity(count, distribution, exponent):
+    """
+    Returns cumulative weights for choosing between count people.
+    """
+    if distribution == "uniform":
+        return list(range(1, count + 1))
+    return list(itertools.accumulate(
+        (rank ** -exponent for rank in range(1, count + 1))
+    ))
+
+
+if __name__ == "__main__":
+    main()
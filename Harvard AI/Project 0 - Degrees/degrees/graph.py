@@ -0,0 +1,199 @@
+from array import array
+
+
+class CompactGraph():
+    """
+    Person/movie graph with IDs interned to dense integers.
+
+    Adjacency is stored CSR-style: the movies of person `p` are
+    `person_movies[person_offsets[p]:person_offsets[p + 1]]`, and the stars
+    of movie `m` are `movie_stars[movie_offsets[m]:movie_offsets[m + 1]]`.
+
+    Person `p` belongs to connected component `components[p]`, which has
+    `component_sizes[components[p]]` people. Components are labelled when
+    the graph is built unless they are passed in, e.g. from a snapshot.
+    """
+
+    def __init__(self, person_ids, movie_ids, person_offsets, person_movies,
+                 movie_offsets, movie_stars, components=None,
+                 component_sizes=None):
+        self.person_ids = person_ids
+        self.movie_ids = movie_ids
+        self.person_index = {
+            person_id: i for i, person_id in enumerate(person_ids)
+        }
+        self.movie_index = {
+            movie_id: i for i, movie_id in enumerate(movie_ids)
+        }
+        self.person_offsets = person_offsets
+        self.person_movies = person_movies
+        self.movie_offsets = movie_offsets
+        self.movie_stars = movie_stars
+
+        if components is None:
+            components, component_sizes = label_components(
+                len(person_ids),
+                (movie_stars[movie_offsets[movie]:movie_offsets[movie + 1]]
+                 for movie in range(len(movie_ids)))
+            )
+        self.components = components
+        self.component_sizes = component_sizes
+
+        # Memory map backing the arrays when loaded from a snapshot
+        self.buffer = None
+
+    @classmethod
+    def from_stars(cls, person_ids, movie_ids, stars):
+        """
+        Builds a graph from lists of person and movie IDs and an iterable of
+        (person_id, movie_id) pairs. Pairs naming an unknown ID, or repeating
+        an earlier pair, are skipped.
+        """
+        person_index = {person_id: i for i, person_id in enumerate(person_ids)}
+        movie_index = {movie_id: i for i, movie_id in enumerate(movie_ids)}
+
+        # Collecting edges as parallel integer arrays
+        edge_people = array("i")
+        edge_movies = array("i")
+        seen = set()
+        for person_id, movie_id in stars:
+            person = person_index.get(person_id)
+            movie = movie_index.get(movie_id)
+            if person is None or movie is None:
+                continue
+            edge = person * len(movie_ids) + movie
+            if edge in seen:
+                continue
+            seen.add(edge)
+            edge_people.append(person)
+            edge_movies.append(movie)
+
+        person_offsets, person_movies = compress(
+            len(person_ids), edge_people, edge_movies
+        )
+        movie_offsets, movie_stars = compress(
+            len(movie_ids), edge_movies, edge_people
+        )
+        return cls(list(person_ids), list(movie_ids), person_offsets,
+                   person_movies, movie_offsets, movie_stars)
+
+    def neighbors(self, person):
+        """
+        Yields (movie, person) integer pairs for people
+        who starred with a given person.
+        """
+        person_movies = self.person_movies
+        movie_offsets = self.movie_offsets
+        movie_stars = self.movie_stars
+        for i in range(self.person_offsets[person],
+                       self.person_offsets[person + 1]):
+            movie = person_movies[i]
+            for j in range(movie_offsets[movie], movie_offsets[movie + 1]):
+                yield movie, movie_stars[j]
+
+    def connected(self, source, target):
+        """
+        Returns True if there is a path between two people.
+        """
+        return self.components[source] == self.components[target]
+
+    def movies_for_person(self, person_id):
+        """
+        Returns the set of movie_ids a person starred in.
+        """
+        person = self.person_index[person_id]
+        return {
+            self.movie_ids[self.person_movies[i]]
+            for i in range(self.person_offsets[person],
+                           self.person_offsets[person + 1])
+        }
+
+    def stars_for_movie(self, movie_id):
+        """
+        Returns the set of person_ids who starred in a movie.
+        """
+        movie = self.movie_index[movie_id]
+        return {
+            self.person_ids[self.movie_stars[i]]
+            for i in range(self.movie_offsets[movie],
+                           self.movie_offsets[movie + 1])
+        }
+
+    def neighbors_for_person(self, person_id):
+        """
+        Returns (movie_id, person_id) pairs for people
+        who starred with a given person.
+        """
+        return {
+            (self.movie_ids[movie], self.person_ids[person])
+            for movie, person in self.neighbors(self.person_index[person_id])
+        }
+
+    def decode_path(self, path):
+        """
+        Converts a path of (movie, person) integer pairs
+        back into (movie_id, person_id) pairs.
+        """
+        if path is None:
+            return None
+        return [(self.movie_ids[movie], self.person_ids[person])
+                for movie, person in path]
+
+
+def compress(size, sources, targets):
+    """
+    Groups parallel edge arrays by source into CSR offsets and targets.
+    """
+    offsets = array("i", bytes(4 * (size + 1)))
+    for source in sources:
+        offsets[source + 1] += 1
+    for i in range(size):
+        offsets[i + 1] += offsets[i]
+
+    # Filling each source's slot range from its start offset
+    position = array("i", offsets[:-1])
+    adjacent = array("i", bytes(4 * len(targets)))
+    for source, target in zip(sources, targets):
+        adjacent[position[source]] = target
+        position[source] += 1
+    return offsets, adjacent
+
+
+def label_components(size, groups):
+    """
+    Labels the connected components of items 0 to size - 1, where every item
+    in a group is connected to every other, using union-find.
+
+    Returns (labels, sizes): item `i` is in component `labels[i]`, and
+    component `c` has `sizes[c]` items.
+    """
+    parent = array("i", range(size))
+
+    def find(item):
+        # Path halving keeps the trees shallow without recursion
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    for group in groups:
+        if not len(group):
+            continue
+        root = find(group[0])
+        for item in group[1:]:
+            other = find(item)
+            if other != root:
+                parent[other] = root
+
+    # Numbering the roots densely in order of first appearance
+    labels = array("i", bytes(4 * size))
+    sizes = array("i")
+    numbers = {}
+    for item in range(size):
+        root = find(item)
+        if root not in numbers:
+            numbers[root] = len(sizes)
+            sizes.append(0)
+        labels[item] = numbers[root]
+        sizes[numbers[root]] += 1
+    return labels, sizes
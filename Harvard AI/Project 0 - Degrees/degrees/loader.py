@@ -0,0 +1,84 @@
+import csv
+import itertools
+import sys
+import time
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+# Rows parsed before they are handed on, so the per-row work
+# stays in one tight loop
+CHUNK_SIZE = 10000
+
+
+def read_rows(path, columns, chunk_size=CHUNK_SIZE):
+    """
+    Yields lists of up to chunk_size tuples holding the named columns of a
+    CSV file, in the order given. Other columns are never kept.
+
+    Values are interned, so an ID repeated across files, e.g. a person_id in
+    both people.csv and stars.csv, is stored once.
+    """
+    intern = sys.intern
+    with open(path, encoding="utf-8", newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if header is None:
+            return
+        try:
+            indexes = [header.index(column) for column in columns]
+        except ValueError:
+            raise ValueError(f"{path} needs columns {', '.join(columns)}")
+        while True:
+            rows = list(itertools.islice(reader, chunk_size))
+            if not rows:
+                return
+            yield [tuple(intern(row[i]) for i in indexes)
+                   for row in rows if row]
+
+
+def read_pairs(path, first, second, chunk_size=CHUNK_SIZE):
+    """
+    Yields (first, second) column values for every row of a CSV file.
+    """
+    for chunk in read_rows(path, (first, second), chunk_size):
+        yield from chunk
+
+
+class LoadStats():
+    """
+    Wall-clock time and peak memory of loading a dataset.
+    """
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.seconds = None
+        self.peak_memory = None
+        self.source = "csv"
+
+    def finish(self, source="csv"):
+        self.seconds = time.perf_counter() - self.start
+        self.peak_memory = peak_memory()
+        self.source = source
+        return self
+
+    def __str__(self):
+        text = f"Loaded from {self.source} in {self.seconds:.2f}s"
+        if self.peak_memory is not None:
+            text += f", peak memory {self.peak_memory / 2 ** 20:.1f} MiB"
+        return text + "."
+
+
+def peak_memory():
+    """
+    Returns the peak resident memory of this process in bytes,
+    or None where the platform doesn't report it.
+    """
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    # Linux reports kilobytes, macOS bytes
+    return peak if sys.platform == "darwin" else peak * 1024
@@ -0,0 +1,92 @@
+from array import array
+from bisect import bisect_left
+
+
+class NameIndex():
+    """
+    Index over lowercase names for prefix and typo-tolerant lookups.
+
+    Every name is split into trigrams, e.g. "kevin" into " ke", "kev",
+    "evi", "vin" and "in ", and each trigram maps to the names containing
+    it. Candidates are ranked by the share of trigrams they have in common
+    with the query.
+    """
+
+    # Trigrams found in more than this share of all names say little about
+    # a match and are skipped when rarer ones are available
+    COMMON = 0.05
+
+    def __init__(self, names):
+        self.names = sorted(names)
+        self.sizes = array("i")
+        self.postings = {}
+        for i, name in enumerate(self.names):
+            grams = trigrams(name)
+            self.sizes.append(len(grams))
+            for gram in grams:
+                posting = self.postings.get(gram)
+                if posting is None:
+                    posting = self.postings[gram] = array("i")
+                posting.append(i)
+
+    def prefix(self, query, limit=None):
+        """
+        Returns names starting with the query, in alphabetical order.
+        """
+        matches = []
+        i = bisect_left(self.names, query)
+        while i < len(self.names) and self.names[i].startswith(query):
+            if limit is not None and len(matches) == limit:
+                break
+            matches.append(self.names[i])
+            i += 1
+        return matches
+
+    def search(self, query, limit=5):
+        """
+        Returns up to limit (name, score) pairs for the names closest to the
+        query, best first. Scores run from 0 to 1, where 1 is an exact match.
+        """
+        query = query.lower().strip()
+        grams = trigrams(query)
+        if not grams:
+            return []
+
+        # Rare trigrams pick the candidates, so common ones never make
+        # every name a candidate
+        postings = sorted(
+            (self.postings[gram] for gram in grams if gram in self.postings),
+            key=len
+        )
+        common = max(1, int(self.COMMON * len(self.names)))
+        candidates = set()
+        for i, posting in enumerate(postings):
+            if i > 0 and len(posting) > common:
+                break
+            candidates.update(posting)
+
+        # Each candidate is scored on all of its trigrams, not just the
+        # rare ones that found it
+        scores = {}
+        for i in candidates:
+            name = self.names[i]
+            shared = len(grams & trigrams(name))
+            scores[name] = shared / (len(grams) + self.sizes[i] - shared)
+
+        # Names the query is the start of rank just below an exact match
+        for name in self.prefix(query, limit + 1):
+            scores[name] = 1.0 if name == query else max(
+                scores.get(name, 0), 0.99
+            )
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+
+def trigrams(name):
+    """
+    Returns the set of three-character substrings of a name,
+    padded with spaces so its start and end count too.
+    """
+    padded = f" {name} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from urllib.parse import parse_qs, urlsplit
+
+import batch
+import degrees
+from util import percentile
+
+# Latencies kept per route for the metrics endpoint
+LATENCY_WINDOW = 1000
+
+# Longest request line or header accepted, in bytes
+MAX_LINE = 8192
+
+
+class Metrics():
+    """
+    Request counts and recent latencies for each route.
+    """
+
+    def __init__(self):
+        self.started = time.time()
+        self.in_flight = 0
+        self.routes = {}
+
+    def record(self, route, status, seconds):
+        metrics = self.routes.setdefault(route, {
+            "requests": 0,
+            "errors": 0,
+            "latencies": deque(maxlen=LATENCY_WINDOW),
+        })
+        metrics["requests"] += 1
+        if status >= 400:
+            metrics["errors"] += 1
+        metrics["latencies"].append(seconds * 1000)
+
+    def report(self):
+        routes = {}
+        for route, metrics in self.routes.items():
+            latencies = sorted(metrics["latencies"])
+            routes[route] = {
+                "requests": metrics["requests"],
+                "errors": metrics["errors"],
+                "p50_ms": percentile(latencies, 50),
+                "p90_ms": percentile(latencies, 90),
+                "p99_ms": percentile(latencies, 99),
+                "max_ms": latencies[-1] if latencies else 0,
+            }
+        return {
+            "uptime_seconds": time.time() - self.started,
+            "in_flight": self.in_flight,
+            "routes": routes,
+        }
+
+
+class DegreesServer():
+    """
+    Answers degrees queries over HTTP, keeping the event loop free by
+    running searches in a pool of worker processes.
+
+    GET /path?source=...&target=...  connects two people, by name or, with
+                                     ids=1, by person ID; search= picks one
+                                     of degrees.SEARCHES
+    GET /names?q=...&limit=...       looks up people by name, with close
+                                     matches if loaded with fuzzy=True
+    GET /metrics                     request counts and latency percentiles
+    """
+
+    def __init__(self, executor):
+        self.executor = executor
+        self.metrics = Metrics()
+        self.routes = {
+            "/path": self.path,
+            "/names": self.names,
+            "/metrics": self.report,
+        }
+
+    async def handle(self, reader, writer):
+        """
+        Reads one request from a connection, answers it and closes it.
+        """
+        start = time.perf_counter()
+        route = None
+        self.metrics.in_flight += 1
+        try:
+            try:
+                method, target = await read_request(reader)
+            except ValueError as e:
+                status, body = 400, {"error": str(e)}
+            else:
+                url = urlsplit(target)
+                route = url.path
+                query = {key: values[-1]
+                         for key, values in parse_qs(url.query).items()}
+                status, body = await self.dispatch(method, route, query)
+            await respond(writer, status, body)
+        except ConnectionError:
+            status = 499
+        finally:
+            self.metrics.in_flight -= 1
+            writer.close()
+        if route in self.routes:
+            self.metrics.record(route, status, time.perf_counter() - start)
+
+    async def dispatch(self, method, route, query):
+        """
+        Returns the (status, body) for a request.
+        """
+        if route not in self.routes:
+            return 404, {"error": f"no route {route}"}
+        if method != "GET":
+            return 405, {"error": "only GET is supported"}
+        try:
+            return 200, await self.routes[route](query)
+        except KeyError as e:
+            return 400, {"error": f"missing parameter {e}"}
+        except ValueError as e:
+            return 400, {"error": str(e)}
+
+    async def path(self, query):
+        source = query["source"]
+        target = query["target"]
+        search = query.get("search", "bfs")
+        if search not in degrees.SEARCHES:
+            raise ValueError(f"unknown search {search}")
+        ids = query.get("ids", "0") not in ("0", "false", "")
+
+        # Searches run in the pool so a slow one can't stall other requests
+        loop = asyncio.get_running_loop()
+        results = await loop.run_in_executor(
+            self.executor, batch.solve_chunk, search, ids, [(source, target)]
+        )
+        return results[0]
+
+    async def names(self, query):
+        name = query["q"]
+        limit = int(query.get("limit", 5))
+        people = [
+            {"id": person_id, **person_record(person_id)}
+            for person_id in sorted(degrees.names.get(name.lower(), ()))
+        ]
+        return {
+            "query": name,
+            "people": people,
+            "suggestions": degrees.suggest_names(name, limit),
+        }
+
+    async def report(self, query):
+        return self.metrics.report()
+
+
+def person_record(person_id):
+    """
+    Returns the name and birth of a person.
+    """
+    person = degrees.people[person_id]
+    return {"name": person["name"], "birth": person["birth"]}
+
+
+async def read_request(reader):
+    """
+    Reads a request line and headers, returning (method, target).
+    """
+    line = await reader.readline()
+    if len(line) > MAX_LINE:
+        raise ValueError("request line too long")
+    parts = line.decode("latin-1").split()
+    if len(parts) != 3 or not parts[2].startswith("HTTP/"):
+        raise ValueError("malformed request line")
+
+    # Headers are read and ignored; every response closes the connection
+    while True:
+        header = await reader.readline()
+        if len(header) > MAX_LINE:
+            raise ValueError("header too long")
+        if header in (b"\r\n", b"\n", b""):
+            break
+    return parts[0], parts[1]
+
+
+async def respond(writer, status, body):
+    """
+    Writes a JSON response and flushes it.
+    """
+    reasons = {200: "OK", 400: "Bad Request", 404: "Not Found",
+               405: "Method Not Allowed"}
+    payload = json.dumps(body).encode("utf-8")
+    writer.write(
+        f"HTTP/1.1 {status} {reasons.get(status, '')}\r\n"
+        f"Content-Type: application/json\r\n"
+        f"Content-Length: {len(payload)}\r\n"
+        f"Connection: close\r\n\r\n".encode("latin-1") + payload
+    )
+    await writer.drain()
+
+
+def make_executor(workers, data):
+    """
+    Returns a process pool whose workers share the loaded graph, forking
+    from this process where possible and loading data otherwise.
+    """
+    if "fork" in multiprocessing.get_all_start_methods():
+        executor = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("fork")
+        )
+    else:
+        executor = ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn"),
+            initializer=batch.load_worker, initargs=data
+        )
+
+    # Starting the workers now, before the event loop is running
+    executor.submit(int).result()
+    return executor
+
+
+async def serve(host, port, executor):
+    server = DegreesServer(executor)
+    listener = await asyncio.start_server(server.handle, host, port)
+    print(f"Serving on http://{host}:{port}")
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Serve degrees queries over a local HTTP/JSON API."
+    )
+    parser.add_argument("directory")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--workers", type=int, default=None,
+                        help="search processes (default: CPU count)")
+    parser.add_argument("--compact", action="store_true")
+    parser.add_argument("--no-snapshot", dest="snapshot",
+                        action="store_false")
+    parser.add_argument("--fuzzy", action="store_true")
+    parser.add_argument("--no-births", dest="births", action="store_false")
+    args = parser.parse_args()
+
+    print("Loading data...")
+    print(degrees.load_data(args.directory, compact=args.compact,
+                            snapshot=args.snapshot, fuzzy=args.fuzzy,
+                            births=args.births))
+
+    executor = make_executor(
+        args.workers,
+        (args.directory, args.compact, args.snapshot, args.fuzzy, args.births)
+    )
+    try:
+        asyncio.run(serve(args.host, args.port, executor))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,167 @@
+import mmap
+import os
+import struct
+import sys
+from array import array
+
+from graph import CompactGraph
+
+# Snapshot file written next to the CSVs
+SNAPSHOT_NAME = "degrees.snapshot"
+
+# Bumped whenever the layout below changes, so stale snapshots are rebuilt
+VERSION = 3
+
+# Integer arrays are stored in native byte order and mapped directly
+MAGIC = b"DEGSNAP" + (b"<" if sys.byteorder == "little" else b">")
+
+CSV_FILES = ("people.csv", "movies.csv", "stars.csv")
+
+# Header: magic, version, (mtime, size) of each CSV, whether births were
+# kept, people, movies, stars, components, followed by the byte length of
+# each string column
+HEADER = struct.Struct(
+    "=8sI" + "q" * (2 * len(CSV_FILES)) + "?qqqq" + "q" * 6
+)
+HEADER_SIZE = (HEADER.size + 7) // 8 * 8
+
+ITEM_SIZE = array("i").itemsize
+SEPARATOR = "\0"
+
+
+def snapshot_path(directory):
+    """
+    Returns the path of the snapshot for a data directory.
+    """
+    return os.path.join(directory, SNAPSHOT_NAME)
+
+
+def fingerprint(directory):
+    """
+    Returns the modification times and sizes of the CSV files, which decide
+    whether a snapshot is still up to date.
+    """
+    stamps = []
+    for name in CSV_FILES:
+        stat = os.stat(os.path.join(directory, name))
+        stamps.extend((stat.st_mtime_ns, stat.st_size))
+    return stamps
+
+
+def write_snapshot(directory, people, movies, graph, births=True):
+    """
+    Writes the loaded people, movies and compact graph, including its
+    connected components, to a binary snapshot. births records whether
+    the people's births were loaded or left empty.
+
+    The file is written to a temporary name and moved into place, so readers
+    never see a partial snapshot. Returns False if it could not be written.
+    """
+    columns = [
+        graph.person_ids,
+        [people[person_id]["name"] for person_id in graph.person_ids],
+        [people[person_id]["birth"] for person_id in graph.person_ids],
+        graph.movie_ids,
+        [movies[movie_id]["title"] for movie_id in graph.movie_ids],
+        [movies[movie_id]["year"] for movie_id in graph.movie_ids],
+    ]
+    blobs = [SEPARATOR.join(column).encode("utf-8") for column in columns]
+
+    header = HEADER.pack(
+        MAGIC, VERSION, *fingerprint(directory), births,
+        len(graph.person_ids), len(graph.movie_ids), len(graph.person_movies),
+        len(graph.component_sizes), *(len(blob) for blob in blobs)
+    )
+
+    path = snapshot_path(directory)
+    temporary = f"{path}.{os.getpid()}.tmp"
+    try:
+        with open(temporary, "wb") as f:
+            f.write(header.ljust(HEADER_SIZE, b"\0"))
+            for adjacency in arrays(graph):
+                f.write(adjacency.tobytes())
+            for blob in blobs:
+                f.write(blob)
+        os.replace(temporary, path)
+    except OSError:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        return False
+    return True
+
+
+def read_snapshot(directory, births=True):
+    """
+    Reads a snapshot written by write_snapshot.
+
+    Returns (people, movies, graph), or None if there is no snapshot or it
+    is from another version, older than the CSV files, without the births
+    that were asked for, or not the length its header gives. The graph's
+    adjacency arrays are views onto the memory-mapped file, so processes
+    loading the same snapshot share those pages.
+    """
+    path = snapshot_path(directory)
+    try:
+        with open(path, "rb") as f:
+            buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        current = fingerprint(directory)
+    except (OSError, ValueError):
+        return None
+
+    if len(buffer) < HEADER_SIZE:
+        return None
+    header = HEADER.unpack_from(buffer)
+    magic, version = header[:2]
+    stamps = list(header[2:2 + 2 * len(CSV_FILES)])
+    has_births = header[2 + 2 * len(CSV_FILES)]
+    counts = header[3 + 2 * len(CSV_FILES):]
+    if magic != MAGIC or version != VERSION or stamps != current:
+        return None
+    if births and not has_births:
+        return None
+    person_count, movie_count, star_count, component_count = counts[:4]
+    blob_sizes = counts[4:]
+    lengths = (person_count + 1, star_count, movie_count + 1, star_count,
+               person_count, component_count)
+
+    # A file cut short, or with anything after the last column, is rebuilt
+    end = HEADER_SIZE + sum(lengths) * ITEM_SIZE + sum(blob_sizes)
+    if len(buffer) != end:
+        return None
+
+    # Mapping the adjacency and component arrays without copying them
+    view = memoryview(buffer)
+    offset = HEADER_SIZE
+    mapped = []
+    for length in lengths:
+        size = length * ITEM_SIZE
+        mapped.append(view[offset:offset + size].cast("i"))
+        offset += size
+
+    columns = []
+    for size, count in zip(blob_sizes, [person_count] * 3 + [movie_count] * 3):
+        text = bytes(view[offset:offset + size]).decode("utf-8")
+        columns.append(text.split(SEPARATOR) if count else [])
+        offset += size
+    person_ids, names, births, movie_ids, titles, years = columns
+
+    people = {
+        person_id: {"name": name, "birth": birth}
+        for person_id, name, birth in zip(person_ids, names, births)
+    }
+    movies = {
+        movie_id: {"title": title, "year": year}
+        for movie_id, title, year in zip(movie_ids, titles, years)
+    }
+    graph = CompactGraph(person_ids, movie_ids, *mapped)
+    graph.buffer = buffer
+    return people, movies, graph
+
+
+def arrays(graph):
+    """
+    Returns the graph's adjacency and component arrays in snapshot order.
+    """
+    return (graph.person_offsets, graph.person_movies,
+            graph.movie_offsets, graph.movie_stars,
+            graph.components, graph.component_sizes)
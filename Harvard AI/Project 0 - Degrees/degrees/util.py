@@ -1,8 +1,12 @@
+from collections import OrderedDict, deque
+
+
 class Node():
     def __init__(self, state, parent, action):
         self.state = state
         self.parent = parent
         self.action = action
+        self.depth = 0 if parent is None else parent.depth + 1
 
 
 class StackFrontier():
@@ -36,3 +40,120 @@ class QueueFrontier(StackFrontier):
             node = self.frontier[0]
             self.frontier = self.frontier[1:]
             return node
+
+
+class IndexedStackFrontier():
+    """
+    Stack frontier backed by a deque and an index of the states it holds,
+    so add, remove and contains_state all run in constant time.
+    """
+
+    def __init__(self):
+        self.frontier = deque()
+        self.states = {}
+
+    def add(self, node):
+        self.frontier.append(node)
+        self.states[node.state] = self.states.get(node.state, 0) + 1
+
+    def contains_state(self, state):
+        return state in self.states
+
+    def empty(self):
+        return len(self.frontier) == 0
+
+    def remove(self):
+        if self.empty():
+            raise Exception("empty frontier")
+        else:
+            node = self.pop()
+            self.forget(node.state)
+            return node
+
+    def pop(self):
+        return self.frontier.pop()
+
+    def forget(self, state):
+        # The same state may be queued more than once
+        count = self.states[state] - 1
+        if count:
+            self.states[state] = count
+        else:
+            del self.states[state]
+
+
+class IndexedQueueFrontier(IndexedStackFrontier):
+
+    def pop(self):
+        return self.frontier.popleft()
+
+
+class LRUCache():
+    """
+    Mapping that keeps entries of at most maxsize in total,
+    evicting the least recently used one first.
+
+    Each entry counts as 1 unless a size function is given, which is
+    called on each value. The newest entry is kept even if it is larger
+    than maxsize on its own.
+    """
+
+    def __init__(self, maxsize, size=None):
+        self.maxsize = maxsize
+        self.size = size
+        self.entries = OrderedDict()
+        self.sizes = {}
+        self.total = 0
+
+    def get(self, key):
+        if key not in self.entries:
+            return None
+        self.entries.move_to_end(key)
+        return self.entries[key]
+
+    def put(self, key, value):
+        if key in self.entries:
+            self.total -= self.sizes[key]
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        self.sizes[key] = 1 if self.size is None else self.size(value)
+        self.total += self.sizes[key]
+        while self.total > self.maxsize and len(self.entries) > 1:
+            oldest, _ = self.entries.popitem(last=False)
+            self.total -= self.sizes.pop(oldest)
+
+    def clear(self):
+        self.entries.clear()
+        self.sizes.clear()
+        self.total = 0
+
+    def __len__(self):
+        return len(self.entries)
+
+
+class SearchStats():
+    """
+    Counts the states a search expands.
+    """
+
+    def __init__(self):
+        self.expanded = 0
+
+    def counting(self, neighbors):
+        """
+        Wraps a neighbors function so every call counts as one expansion.
+        """
+        def counted(state):
+            self.expanded += 1
+            return neighbors(state)
+        return counted
+
+
+def percentile(values, percent):
+    """
+    Returns the nearest-rank percentile of a sorted list of values.
+    """
+    if not values:
+        return 0
+    rank = max(1, -(-percent * len(values) // 100))
+    return values[rank - 1]
@@ -0,0 +1,178 @@
+"""
+Tic Tac Toe on bitboards
+
+A position is a pair of 9-bit integers (x, o), one mask of filled cells per
+player, where cell (i, j) is bit 3 * i + j. Moves, wins and turns are then
+bit operations and table lookups, so the search never copies a board.
+"""
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Mask with every cell set
+FULL = 0b111111111
+
+# Rows, columns and diagonals, as cell masks
+WIN_MASKS = [
+    0b000000111, 0b000111000, 0b111000000,
+    0b001001001, 0b010010010, 0b100100100,
+    0b100010001, 0b001010100,
+]
+
+# WINS[mask] is True if the cells of mask complete a line
+WINS = [any(mask & line == line for line in WIN_MASKS)
+        for mask in range(FULL + 1)]
+
+# COUNTS[mask] is the number of cells set in mask
+COUNTS = [bin(mask).count("1") for mask in range(FULL + 1)]
+
+# Cells in the order the search tries them: centre, corners, then edges
+ORDER = [4, 0, 2, 6, 8, 1, 3, 5, 7]
+
+
+def from_board(board):
+    """
+    Returns the (x, o) masks of a board in the nested list format.
+    """
+    x = o = 0
+    for i in range(3):
+        for j in range(3):
+            if board[i][j] == X:
+                x |= 1 << (3 * i + j)
+            elif board[i][j] == O:
+                o |= 1 << (3 * i + j)
+    return x, o
+
+
+def to_board(x, o):
+    """
+    Returns the nested list board of the (x, o) masks.
+    """
+    return [[X if x >> (3 * i + j) & 1 else O if o >> (3 * i + j) & 1
+             else EMPTY for j in range(3)] for i in range(3)]
+
+
+def player(x, o):
+    """
+    Returns player who has the next turn.
+    """
+    return X if COUNTS[x | o] % 2 == 0 else O
+
+
+def actions(x, o):
+    """
+    Returns the empty cells, as bit indexes, in search order.
+    """
+    filled = x | o
+    return [cell for cell in ORDER if not filled >> cell & 1]
+
+
+def result(x, o, cell):
+    """
+    Returns the (x, o) masks after the player to move takes a cell.
+    """
+    bit = 1 << cell
+    if (x | o) & bit:
+        raise Exception("Invalid Action!")
+    if COUNTS[x | o] % 2 == 0:
+        return x | bit, o
+    return x, o | bit
+
+
+def winner(x, o):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    if WINS[x]:
+        return X
+    if WINS[o]:
+        return O
+    return None
+
+
+def terminal(x, o):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return WINS[x] or WINS[o] or x | o == FULL
+
+
+def utility(x, o):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    if WINS[x]:
+        return 1
+    if WINS[o]:
+        return -1
+    return 0
+
+
+def alpha_beta(x, o, alpha=-1, beta=1, stats=None):
+    """
+    Returns the minimax value of a position, searched with alpha-beta
+    pruning. Values outside (alpha, beta) are clamped to that window.
+
+    If a stats dictionary is given, its "nodes" entry counts the positions
+    searched.
+    """
+    if stats is not None:
+        stats["nodes"] = stats.get("nodes", 0) + 1
+    if WINS[x]:
+        return 1
+    if WINS[o]:
+        return -1
+    filled = x | o
+    if filled == FULL:
+        return 0
+
+    if COUNTS[filled] % 2 == 0:
+        for cell in ORDER:
+            bit = 1 << cell
+            if not filled & bit:
+                value = alpha_beta(x | bit, o, alpha, beta, stats)
+                if value > alpha:
+                    alpha = value
+                    if alpha >= beta:
+                        break
+        return alpha
+
+    for cell in ORDER:
+        bit = 1 << cell
+        if not filled & bit:
+            value = alpha_beta(x, o | bit, alpha, beta, stats)
+            if value < beta:
+                beta = value
+                if alpha >= beta:
+                    break
+    return beta
+
+
+def best_move(board, stats=None):
+    """
+    Returns the optimal action (i, j) for the player to move on a board in
+    the nested list format, or None if the game is over.
+    """
+    x, o = from_board(board)
+    if terminal(x, o):
+        return None
+
+    maximising = player(x, o) == X
+    best_cell = None
+    best_value = -2 if maximising else 2
+    for cell in actions(x, o):
+        child = result(x, o, cell)
+        if maximising:
+            value = alpha_beta(*child, max(best_value, -1), 1, stats)
+            if value > best_value:
+                best_cell, best_value = cell, value
+        else:
+            value = alpha_beta(*child, -1, min(best_value, 1), stats)
+            if value < best_value:
+                best_cell, best_value = cell, value
+
+        # Nothing beats a win
+        if best_value == (1 if maximising else -1):
+            break
+    return divmod(best_cell, 3)
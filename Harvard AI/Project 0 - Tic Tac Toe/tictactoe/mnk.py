@@ -0,0 +1,309 @@
+"""
+m,n,k-game Player
+
+Tic Tac Toe generalised to a board of m rows and n columns, won by the first
+player to get k marks in a row across, down or diagonally: 3,3,3 is Tic Tac
+Toe and 15,15,5 is Gomoku. Boards use the same nested list format as
+tictactoe.py.
+"""
+
+import time
+
+X = "X"
+O = "O"
+EMPTY = None
+
+# Score of a won position, less the number of moves it took; heuristic
+# scores stay far below it
+WIN = 10 ** 12
+
+# Directions a line runs in from a cell: across, down and both diagonals
+DIRECTIONS = [(0, 1), (1, 0), (1, 1), (1, -1)]
+
+# Empty cells are only searched if within this many cells of a mark
+REACH = 2
+
+# Positions searched between checks of the clock
+CLOCK_INTERVAL = 64
+
+# Maps (m, n, k) to every line of k cells on such a board
+window_cache = {}
+
+
+class SearchTimeout(Exception):
+    """
+    Raised inside a search when its time budget runs out.
+    """
+
+
+def initial_state(m=3, n=3):
+    """
+    Returns an empty board of m rows and n columns.
+    """
+    return [[EMPTY] * n for _ in range(m)]
+
+
+def player(board):
+    """
+    Returns player who has the next turn on a board.
+    """
+    played = sum(cell is not EMPTY for row in board for cell in row)
+    return X if played % 2 == 0 else O
+
+
+def actions(board):
+    """
+    Returns set of all possible actions (i, j) available on the board.
+    """
+    return {(i, j) for i, row in enumerate(board)
+            for j, cell in enumerate(row) if cell is EMPTY}
+
+
+def result(board, action):
+    """
+    Returns the board that results from making move (i, j) on the board.
+    """
+    i, j = action
+    if not (0 <= i < len(board) and 0 <= j < len(board[0])) \
+            or board[i][j] is not EMPTY:
+        raise Exception("Invalid Action!")
+    board_copy = [list(row) for row in board]
+    board_copy[i][j] = player(board)
+    return board_copy
+
+
+def wins_at(board, action, k):
+    """
+    Returns True if the mark on cell action is part of k in a row.
+
+    Only the four lines through that cell are walked, so checking the last
+    move costs O(k) rather than a scan of the board.
+    """
+    i, j = action
+    mark = board[i][j]
+    if mark is EMPTY:
+        return False
+    m, n = len(board), len(board[0])
+    for di, dj in DIRECTIONS:
+        count = 1
+        for sign in (1, -1):
+            r, c = i + sign * di, j + sign * dj
+            while 0 <= r < m and 0 <= c < n and board[r][c] == mark:
+                count += 1
+                r, c = r + sign * di, c + sign * dj
+        if count >= k:
+            return True
+    return False
+
+
+def winner(board, k):
+    """
+    Returns the winner of the game, if there is one.
+    """
+    for i, row in enumerate(board):
+        for j, cell in enumerate(row):
+            if cell is not EMPTY and wins_at(board, (i, j), k):
+                return cell
+    return None
+
+
+def terminal(board, k):
+    """
+    Returns True if game is over, False otherwise.
+    """
+    return winner(board, k) is not None or not actions(board)
+
+
+def utility(board, k):
+    """
+    Returns 1 if X has won the game, -1 if O has won, 0 otherwise.
+    """
+    mark = winner(board, k)
+    return 1 if mark == X else -1 if mark == O else 0
+
+
+def windows(m, n, k):
+    """
+    Returns every line of k cells on an m by n board.
+    """
+    if (m, n, k) not in window_cache:
+        window_cache[(m, n, k)] = [
+            [(i + step * di, j + step * dj) for step in range(k)]
+            for i in range(m) for j in range(n) for di, dj in DIRECTIONS
+            if 0 <= i + (k - 1) * di < m and 0 <= j + (k - 1) * dj < n
+        ]
+    return window_cache[(m, n, k)]
+
+
+def evaluate(board, k, mark):
+    """
+    Returns a heuristic score of a board for the player mark.
+
+    Each line of k cells that only one player has marks in is still
+    winnable by them, and counts 10 ** marks in their favour.
+    """
+    score = 0
+    for window in windows(len(board), len(board[0]), k):
+        x_marks = o_marks = 0
+        for i, j in window:
+            cell = board[i][j]
+            if cell == X:
+                x_marks += 1
+            elif cell == O:
+                o_marks += 1
+        if x_marks and not o_marks:
+            score += 10 ** x_marks
+        elif o_marks and not x_marks:
+            score -= 10 ** o_marks
+    return score if mark == X else -score
+
+
+class Search():
+    """
+    Iterative-deepening alpha-beta search from one position.
+
+    The search plays and takes back moves on its own copy of the board,
+    checking only the lines through each move for a win. Scores are from
+    the point of view of the player to move.
+    """
+
+    def __init__(self, board, k, deadline=None):
+        self.board = [list(row) for row in board]
+        self.m = len(board)
+        self.n = len(board[0])
+        self.k = k
+        self.deadline = deadline
+        self.nodes = 0
+        self.marks = [(i, j) for i, row in enumerate(board)
+                      for j, cell in enumerate(row) if cell is not EMPTY]
+        self.empty = self.m * self.n - len(self.marks)
+
+        # Cells nearer the centre are tried first
+        centre_i, centre_j = (self.m - 1) / 2, (self.n - 1) / 2
+        self.centrality = {
+            (i, j): max(abs(i - centre_i), abs(j - centre_j))
+            for i in range(self.m) for j in range(self.n)
+        }
+
+    def candidates(self):
+        """
+        Returns the empty cells near a mark, nearest the centre first, or
+        the centre of an empty board.
+        """
+        if not self.marks:
+            return [(self.m // 2, self.n // 2)]
+        board = self.board
+        cells = set()
+        for i, j in self.marks:
+            for r in range(max(i - REACH, 0), min(i + REACH + 1, self.m)):
+                for c in range(max(j - REACH, 0),
+                               min(j + REACH + 1, self.n)):
+                    if board[r][c] is EMPTY:
+                        cells.add((r, c))
+        return sorted(cells, key=lambda cell: (self.centrality[cell], cell))
+
+    def play(self, action, mark):
+        self.board[action[0]][action[1]] = mark
+        self.marks.append(action)
+        self.empty -= 1
+
+    def undo(self, action):
+        self.board[action[0]][action[1]] = EMPTY
+        self.marks.pop()
+        self.empty += 1
+
+    def score_move(self, action, mark, depth, alpha, beta, ply):
+        """
+        Returns the score for mark of playing action, searched to depth.
+        """
+        self.play(action, mark)
+        try:
+            if wins_at(self.board, action, self.k):
+                return WIN - ply
+            other = O if mark == X else X
+            return -self.negamax(other, depth - 1, -beta, -alpha, ply + 1)
+        finally:
+            self.undo(action)
+
+    def negamax(self, mark, depth, alpha, beta, ply):
+        """
+        Returns the score of the position for mark, the player to move.
+        """
+        self.nodes += 1
+        if (self.deadline is not None
+                and self.nodes % CLOCK_INTERVAL == 0
+                and time.perf_counter() > self.deadline):
+            raise SearchTimeout()
+        if self.empty == 0:
+            return 0
+        if depth == 0:
+            return evaluate(self.board, self.k, mark)
+
+        best = -WIN
+        for action in self.candidates():
+            score = self.score_move(action, mark, depth, alpha, beta, ply)
+            if score > best:
+                best = score
+                if best > alpha:
+                    alpha = best
+                    if alpha >= beta:
+                        break
+        return best
+
+    def root(self, depth, moves):
+        """
+        Returns (score, move) for the player to move, trying moves in order.
+        """
+        mark = X if len(self.marks) % 2 == 0 else O
+        alpha = -WIN
+        best_move = moves[0]
+        for action in moves:
+            score = self.score_move(action, mark, depth, alpha, WIN, 1)
+            if score > alpha:
+                alpha, best_move = score, action
+        return alpha, best_move
+
+
+def best_move(board, k, time_limit=1.0, max_depth=None, stats=None):
+    """
+    Returns the best action (i, j) found for the player to move within
+    about time_limit seconds, or None if the game is over.
+
+    The board is searched one move deeper at a time, up to max_depth moves
+    or the end of the game, with the previous depth's best move tried
+    first. The move from the deepest search that finished in time is
+    returned. If a stats dictionary is given, it gets the "nodes" searched,
+    the "depth" completed and the best "score".
+    """
+    if terminal(board, k):
+        return None
+
+    search = Search(board, k, time.perf_counter() + time_limit)
+    moves = search.candidates()
+    limit = search.empty if max_depth is None else min(max_depth,
+                                                       search.empty)
+    move = moves[0]
+    score = None
+    depth = 0
+
+    # With one move to make there's nothing to search
+    if len(moves) == 1:
+        limit = 0
+    for depth in range(1, limit + 1):
+        try:
+            score, move = search.root(depth, moves)
+        except SearchTimeout:
+            depth -= 1
+            break
+        moves.remove(move)
+        moves.insert(0, move)
+
+        # A forced win or loss won't change with more depth
+        if abs(score) > WIN // 2:
+            break
+
+    if stats is not None:
+        stats["nodes"] = stats.get("nodes", 0) + search.nodes
+        stats["depth"] = depth
+        stats["score"] = score
+    return move
@@ -0,0 +1,139 @@
+"""
+Tic Tac Toe opening book
+
+Every position reachable from the empty board is solved once and stored in
+a binary table indexed by the position's base-3 number, where cell (i, j)
+contributes 3 ** (3 * i + j) times 1 for X or 2 for O. Each entry is one
+byte: the minimax value plus one in the high nibble and the optimal cell in
+the low nibble, which is NO_MOVE once the game is over. Positions that
+can't arise in a legal game hold UNREACHABLE.
+"""
+
+import argparse
+import os
+
+import bitboard
+
+# Identifies book files, and the version of their layout
+MAGIC = b"TTTBOOK1"
+
+# Number of base-3 position numbers, reachable or not
+SIZE = 3 ** 9
+
+# Low nibble of positions without a move
+NO_MOVE = 0x0F
+
+# Entry of positions no legal game reaches
+UNREACHABLE = 0xFF
+
+BOOK_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                         "opening.book")
+
+# TERNARY[mask] is the base-3 number of a position with X on the cells
+# of mask and nothing else
+TERNARY = [sum(3 ** cell for cell in range(9) if mask >> cell & 1)
+           for mask in range(bitboard.FULL + 1)]
+
+
+def position_number(x, o):
+    """
+    Returns the book index of the (x, o) masks.
+    """
+    return TERNARY[x] + 2 * TERNARY[o]
+
+
+def solve():
+    """
+    Returns {(x, o): value} for every position reachable from the empty
+    board.
+    """
+    values = {}
+
+    def value(x, o):
+        if (x, o) in values:
+            return values[(x, o)]
+        if bitboard.terminal(x, o):
+            v = bitboard.utility(x, o)
+        else:
+            children = [value(*bitboard.result(x, o, cell))
+                        for cell in bitboard.actions(x, o)]
+            if bitboard.player(x, o) == bitboard.X:
+                v = max(children)
+            else:
+                v = min(children)
+        values[(x, o)] = v
+        return v
+
+    value(0, 0)
+    return values
+
+
+def build():
+    """
+    Returns the book table, choosing the first optimal cell in the
+    bitboard search order for each position.
+    """
+    table = bytearray([UNREACHABLE] * SIZE)
+    values = solve()
+    for (x, o), v in values.items():
+        move = NO_MOVE
+        if not bitboard.terminal(x, o):
+            for cell in bitboard.actions(x, o):
+                if values[bitboard.result(x, o, cell)] == v:
+                    move = cell
+                    break
+        table[position_number(x, o)] = (v + 1) << 4 | move
+    return bytes(table)
+
+
+def write(table, path=BOOK_FILE):
+    """
+    Writes a book table to a file.
+    """
+    with open(path, "wb") as f:
+        f.write(MAGIC + table)
+
+
+def load(path=BOOK_FILE):
+    """
+    Returns the book table stored in a file, or builds it if there is no
+    such file.
+    """
+    if not os.path.exists(path):
+        return build()
+    with open(path, "rb") as f:
+        data = f.read()
+    if not data.startswith(MAGIC) or len(data) != len(MAGIC) + SIZE:
+        raise ValueError(f"{path} is not an opening book")
+    return data[len(MAGIC):]
+
+
+def lookup(table, board):
+    """
+    Returns [value, move] for a board in the nested list format, where
+    move is None if the game is over.
+    """
+    entry = table[position_number(*bitboard.from_board(board))]
+    if entry == UNREACHABLE:
+        raise ValueError("board is not reachable in a legal game")
+    move = entry & 0x0F
+    value = (entry >> 4) - 1
+    return [value, None if move == NO_MOVE else divmod(move, 3)]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Solve every Tic Tac Toe position into an opening book."
+    )
+    parser.add_argument("--output", default=BOOK_FILE)
+    args = parser.parse_args()
+
+    table = build()
+    write(table, args.output)
+    positions = sum(1 for entry in table if entry != UNREACHABLE)
+    print(f"Wrote {positions} positions to {args.output} "
+          f"({len(MAGIC) + len(table)} bytes).")
+
+
+if __name__ == "__main__":
+    main()
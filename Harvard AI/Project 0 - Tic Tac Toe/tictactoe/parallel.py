@@ -0,0 +1,170 @@
+"""
+Parallel m,n,k-game search
+
+Splits the moves at the root of a fixed-depth alpha-beta search across a
+pool of processes. Workers share the best root score found so far, so each
+root move is searched against the tightest bound known when it starts, and
+the move returned is the one a serial search would pick.
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+
+import mnk
+
+# Best root score found so far, shared between a pool's workers
+bound = None
+
+
+class RootSplitSearch():
+    """
+    Pool of worker processes that each search some of the root moves.
+    """
+
+    def __init__(self, workers=None):
+        if "fork" in multiprocessing.get_all_start_methods():
+            context = multiprocessing.get_context("fork")
+        else:
+            context = multiprocessing.get_context("spawn")
+        self.bound = context.Value("q", -mnk.WIN)
+        self.pool = context.Pool(workers, init_worker, (self.bound,))
+
+    def best_move(self, board, k, depth, stats=None):
+        """
+        Returns the best action (i, j) for the player to move, searched
+        depth moves ahead, or None if the game is over.
+
+        If a stats dictionary is given, it gets the "nodes" searched and
+        the best "score".
+        """
+        if mnk.terminal(board, k):
+            return None
+        moves = mnk.Search(board, k).candidates()
+        self.bound.value = -mnk.WIN
+
+        # Results come back in move order, so ties go to the earlier move
+        # just as in the serial search
+        tasks = [(board, k, depth, action) for action in moves]
+        best_move, best_score = None, None
+        for action, score, nodes in self.pool.imap(search_move, tasks):
+            if best_score is None or score > best_score:
+                best_move, best_score = action, score
+            if stats is not None:
+                stats["nodes"] = stats.get("nodes", 0) + nodes
+        if stats is not None:
+            stats["score"] = best_score
+        return best_move
+
+    def close(self):
+        self.pool.terminate()
+
+
+def init_worker(shared):
+    global bound
+    bound = shared
+
+
+def search_move(task):
+    """
+    Returns (action, score, nodes searched) for one root move, inside a
+    worker process.
+
+    The move is searched with alpha one below the shared bound, so a move
+    that ties the best so far still gets its exact score, and any score
+    returned that is below the bound can't be the best.
+    """
+    board, k, depth, action = task
+    search = mnk.Search(board, k)
+    alpha = max(bound.value - 1, -mnk.WIN)
+    score = search.score_move(action, mnk.player(board), depth, alpha,
+                              mnk.WIN, 1)
+    with bound.get_lock():
+        if score > bound.value:
+            bound.value = score
+    return action, score, search.nodes
+
+
+def serial_best_move(board, k, depth, stats=None):
+    """
+    Returns the best action (i, j) found by searching every root move in
+    turn, depth moves ahead, or None if the game is over.
+    """
+    if mnk.terminal(board, k):
+        return None
+    search = mnk.Search(board, k)
+    score, move = search.root(depth, search.candidates())
+    if stats is not None:
+        stats["nodes"] = stats.get("nodes", 0) + search.nodes
+        stats["score"] = score
+    return move
+
+
+def random_positions(count, m, n, k, moves, rng):
+    """
+    Returns up to count positions reached by playing random moves.
+    """
+    positions = []
+    attempts = 0
+    while len(positions) < count and attempts < 100 * count:
+        attempts += 1
+        board = mnk.initial_state(m, n)
+        for _ in range(moves):
+            board = mnk.result(board, rng.choice(sorted(mnk.actions(board))))
+            if mnk.terminal(board, k):
+                break
+        else:
+            positions.append(board)
+    return positions
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Benchmark root-split parallel search against serial."
+    )
+    parser.add_argument("--size", default="5x5", help="board rows x columns")
+    parser.add_argument("--k", type=int, default=4, help="marks in a row")
+    parser.add_argument("--depth", type=int, default=4)
+    parser.add_argument("--positions", type=int, default=5)
+    parser.add_argument("--moves", type=int, default=4,
+                        help="random moves played into each position")
+    parser.add_argument("--workers", default="1,2,4",
+                        help="comma-separated pool sizes")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    m, n = (int(side) for side in args.size.split("x"))
+    positions = random_positions(args.positions, m, n, args.k, args.moves,
+                                 random.Random(args.seed))
+
+    stats = {}
+    start = time.perf_counter()
+    expected = [serial_best_move(board, args.k, args.depth, stats)
+                for board in positions]
+    serial = time.perf_counter() - start
+    print(f"{len(positions)} positions on {m}x{n}, k={args.k}, "
+          f"depth {args.depth}; {multiprocessing.cpu_count()} CPU(s).")
+    print(f"{'workers':<9}{'seconds':>9}{'nodes':>11}{'speedup':>9}")
+    print(f"{'serial':<9}{serial:>9.2f}{stats['nodes']:>11}{1:>9.2f}")
+
+    for workers in (int(count) for count in args.workers.split(",")):
+        search = RootSplitSearch(workers)
+        try:
+            stats = {}
+            start = time.perf_counter()
+            moves = [search.best_move(board, args.k, args.depth, stats)
+                     for board in positions]
+            seconds = time.perf_counter() - start
+        finally:
+            search.close()
+        if moves != expected:
+            sys.exit(f"{workers} workers chose different moves: "
+                     f"{moves} instead of {expected}")
+        print(f"{workers:<9}{seconds:>9.2f}{stats['nodes']:>11}"
+              f"{serial / seconds:>9.2f}")
+
+
+if __name__ == "__main__":
+    main()
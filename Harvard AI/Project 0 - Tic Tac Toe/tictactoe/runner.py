@@ -1,146 +1,219 @@
+import multiprocessing
 import pygame
 import sys
 import time
 
 import tictactoe as ttt
 
-pygame.init()
-size = width, height = 600, 400
-
-# Colors
-black = (0, 0, 0)
-white = (255, 255, 255)
-
-screen = pygame.display.set_mode(size)
-
-mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
-largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
-moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
-
-user = None
-board = ttt.initial_state()
-ai_turn = False
-
-while True:
-
-    for event in pygame.event.get():
-        if event.type == pygame.QUIT:
-            sys.exit()
-
-    screen.fill(black)
-
-    # Let user choose a player.
-    if user is None:
-
-        # Draw title
-        title = largeFont.render("Play Tic-Tac-Toe", True, white)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 50)
-        screen.blit(title, titleRect)
-
-        # Draw buttons
-        playXButton = pygame.Rect((width / 8), (height / 2), width / 4, 50)
-        playX = mediumFont.render("Play as X", True, black)
-        playXRect = playX.get_rect()
-        playXRect.center = playXButton.center
-        pygame.draw.rect(screen, white, playXButton)
-        screen.blit(playX, playXRect)
-
-        playOButton = pygame.Rect(5 * (width / 8), (height / 2), width / 4, 50)
-        playO = mediumFont.render("Play as O", True, black)
-        playORect = playO.get_rect()
-        playORect.center = playOButton.center
-        pygame.draw.rect(screen, white, playOButton)
-        screen.blit(playO, playORect)
-
-        # Check if button is clicked
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1:
-            mouse = pygame.mouse.get_pos()
-            if playXButton.collidepoint(mouse):
-                time.sleep(0.2)
-                user = ttt.X
-            elif playOButton.collidepoint(mouse):
-                time.sleep(0.2)
-                user = ttt.O
-
-    else:
-
-        # Draw game board
-        tile_size = 80
-        tile_origin = (width / 2 - (1.5 * tile_size),
-                       height / 2 - (1.5 * tile_size))
-        tiles = []
-        for i in range(3):
-            row = []
-            for j in range(3):
-                rect = pygame.Rect(
-                    tile_origin[0] + j * tile_size,
-                    tile_origin[1] + i * tile_size,
-                    tile_size, tile_size
-                )
-                pygame.draw.rect(screen, white, rect, 3)
-
-                if board[i][j] != ttt.EMPTY:
-                    move = moveFont.render(board[i][j], True, white)
-                    moveRect = move.get_rect()
-                    moveRect.center = rect.center
-                    screen.blit(move, moveRect)
-                row.append(rect)
-            tiles.append(row)
-
-        game_over = ttt.terminal(board)
-        player = ttt.player(board)
-
-        # Show title
-        if game_over:
-            winner = ttt.winner(board)
-            if winner is None:
-                title = f"Game Over: Tie."
-            else:
-                title = f"Game Over: {winner} wins."
-        elif user == player:
-            title = f"Play as {user}"
+# Shortest time the computer is shown thinking, so its move doesn't
+# appear instantly
+MIN_THINKING = 0.5
+
+
+class AIWorker():
+    """
+    Runs minimax in a separate process, so the window keeps drawing and
+    handling events while the computer thinks.
+    """
+
+    def __init__(self):
+        self.pool = None
+        self.pending = None
+        self.started = None
+
+    def start(self, board):
+        if self.pool is None:
+            # A forked worker would inherit pygame's display and audio
+            # state, so the worker is spawned fresh, importing this script
+            # under its __main__ guard
+            context = multiprocessing.get_context("spawn")
+            self.pool = context.Pool(1)
+        self.pending = self.pool.apply_async(ttt.minimax, (board,))
+        self.started = time.perf_counter()
+
+    def thinking(self):
+        return self.pending is not None
+
+    def elapsed(self):
+        return time.perf_counter() - self.started
+
+    def poll(self):
+        """
+        Returns the computer's move once it's found and has been shown
+        thinking for MIN_THINKING seconds, and None until then.
+        """
+        if (self.pending is None or not self.pending.ready()
+                or self.elapsed() < MIN_THINKING):
+            return None
+        move = self.pending.get()
+        self.pending = None
+        return move
+
+    def cancel(self):
+        """
+        Abandons the current search, stopping its process if it's still
+        running.
+        """
+        if self.pending is not None and not self.pending.ready():
+            self.close()
+        self.pending = None
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.terminate()
+            self.pool = None
+
+
+def main():
+
+    pygame.init()
+    size = width, height = 600, 400
+
+    # Colors
+    black = (0, 0, 0)
+    white = (255, 255, 255)
+
+    screen = pygame.display.set_mode(size)
+
+    mediumFont = pygame.font.Font("OpenSans-Regular.ttf", 28)
+    largeFont = pygame.font.Font("OpenSans-Regular.ttf", 40)
+    moveFont = pygame.font.Font("OpenSans-Regular.ttf", 60)
+
+    user = None
+    board = ttt.initial_state()
+    worker = AIWorker()
+
+    while True:
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                worker.close()
+                sys.exit()
+
+        screen.fill(black)
+
+        # Let user choose a player.
+        if user is None:
+
+            # Draw title
+            title = largeFont.render("Play Tic-Tac-Toe", True, white)
+            titleRect = title.get_rect()
+            titleRect.center = ((width / 2), 50)
+            screen.blit(title, titleRect)
+
+            # Draw buttons
+            playXButton = pygame.Rect((width / 8), (height / 2),
+                                      width / 4, 50)
+            playX = mediumFont.render("Play as X", True, black)
+            playXRect = playX.get_rect()
+            playXRect.center = playXButton.center
+            pygame.draw.rect(screen, white, playXButton)
+            screen.blit(playX, playXRect)
+
+            playOButton = pygame.Rect(5 * (width / 8), (height / 2),
+                                      width / 4, 50)
+            playO = mediumFont.render("Play as O", True, black)
+            playORect = playO.get_rect()
+            playORect.center = playOButton.center
+            pygame.draw.rect(screen, white, playOButton)
+            screen.blit(playO, playORect)
+
+            # Check if button is clicked
+            click, _, _ = pygame.mouse.get_pressed()
+            if click == 1:
+                mouse = pygame.mouse.get_pos()
+                if playXButton.collidepoint(mouse):
+                    time.sleep(0.2)
+                    user = ttt.X
+                elif playOButton.collidepoint(mouse):
+                    time.sleep(0.2)
+                    user = ttt.O
+
         else:
-            title = f"Computer thinking..."
-        title = largeFont.render(title, True, white)
-        titleRect = title.get_rect()
-        titleRect.center = ((width / 2), 30)
-        screen.blit(title, titleRect)
-
-        # Check for AI move
-        if user != player and not game_over:
-            if ai_turn:
-                time.sleep(0.5)
-                move = ttt.minimax(board)
-                board = ttt.result(board, move)
-                ai_turn = False
-            else:
-                ai_turn = True
 
-        # Check for a user move
-        click, _, _ = pygame.mouse.get_pressed()
-        if click == 1 and user == player and not game_over:
-            mouse = pygame.mouse.get_pos()
+            # Draw game board
+            tile_size = 80
+            tile_origin = (width / 2 - (1.5 * tile_size),
+                           height / 2 - (1.5 * tile_size))
+            tiles = []
             for i in range(3):
+                row = []
                 for j in range(3):
-                    if (board[i][j] == ttt.EMPTY and tiles[i][j].collidepoint(mouse)):
-                        board = ttt.result(board, (i, j))
-
-        if game_over:
-            againButton = pygame.Rect(width / 3, height - 65, width / 3, 50)
-            again = mediumFont.render("Play Again", True, black)
-            againRect = again.get_rect()
-            againRect.center = againButton.center
-            pygame.draw.rect(screen, white, againButton)
-            screen.blit(again, againRect)
+                    rect = pygame.Rect(
+                        tile_origin[0] + j * tile_size,
+                        tile_origin[1] + i * tile_size,
+                        tile_size, tile_size
+                    )
+                    pygame.draw.rect(screen, white, rect, 3)
+
+                    if board[i][j] != ttt.EMPTY:
+                        move = moveFont.render(board[i][j], True, white)
+                        moveRect = move.get_rect()
+                        moveRect.center = rect.center
+                        screen.blit(move, moveRect)
+                    row.append(rect)
+                tiles.append(row)
+
+            game_over = ttt.terminal(board)
+            player = ttt.player(board)
+
+            # Show title
+            if game_over:
+                winner = ttt.winner(board)
+                if winner is None:
+                    title = f"Game Over: Tie."
+                else:
+                    title = f"Game Over: {winner} wins."
+            elif user == player:
+                title = f"Play as {user}"
+            elif worker.thinking():
+                title = f"Computer thinking... {worker.elapsed():.1f}s"
+            else:
+                title = f"Computer thinking..."
+            title = largeFont.render(title, True, white)
+            titleRect = title.get_rect()
+            titleRect.center = ((width / 2), 30)
+            screen.blit(title, titleRect)
+
+            # Check for AI move, searching in the background
+            if user != player and not game_over:
+                if worker.thinking():
+                    move = worker.poll()
+                    if move is not None:
+                        board = ttt.result(board, move)
+                else:
+                    worker.start(board)
+
+            # Check for a user move
             click, _, _ = pygame.mouse.get_pressed()
-            if click == 1:
+            if click == 1 and user == player and not game_over:
                 mouse = pygame.mouse.get_pos()
-                if againButton.collidepoint(mouse):
-                    time.sleep(0.2)
-                    user = None
-                    board = ttt.initial_state()
-                    ai_turn = False
-
-    pygame.display.flip()
+                for i in range(3):
+                    for j in range(3):
+                        if (board[i][j] == ttt.EMPTY
+                                and tiles[i][j].collidepoint(mouse)):
+                            board = ttt.result(board, (i, j))
+
+            # Play Again also cancels a search still running
+            if game_over or worker.thinking():
+                againButton = pygame.Rect(width / 3, height - 65,
+                                          width / 3, 50)
+                again = mediumFont.render("Play Again", True, black)
+                againRect = again.get_rect()
+                againRect.center = againButton.center
+                pygame.draw.rect(screen, white, againButton)
+                screen.blit(again, againRect)
+                click, _, _ = pygame.mouse.get_pressed()
+                if click == 1:
+                    mouse = pygame.mouse.get_pos()
+                    if againButton.collidepoint(mouse):
+                        time.sleep(0.2)
+                        worker.cancel()
+                        user = None
+                        board = ttt.initial_state()
+
+        pygame.display.flip()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Headless Tic Tac Toe self-play
+
+Plays many games of the AI against itself or against random moves across a
+pool of processes, checking that the AI never loses and timing its moves.
+"""
+
+import argparse
+import multiprocessing
+import random
+import sys
+import time
+
+import tictactoe as ttt
+
+OPPONENTS = ["ai", "random"]
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Play Tic Tac Toe AI games without the pygame window."
+    )
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--opponent", choices=OPPONENTS, default="random")
+    parser.add_argument("--search", choices=ttt.SEARCHES, default="memo")
+    parser.add_argument("--workers", type=int, default=None,
+                        help="game processes (default: CPU count)")
+    parser.add_argument("--chunksize", type=int, default=16,
+                        help="games sent to a worker at a time")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    report = Report()
+    games = [(game, args.search, args.opponent, args.seed)
+             for game in range(args.games)]
+    with multiprocessing.Pool(args.workers) as pool:
+        for game in pool.imap_unordered(play_game, games, args.chunksize):
+            report.add(game)
+    report.seconds = time.perf_counter() - start
+
+    print(report)
+    if report.losses:
+        sys.exit(f"The AI lost {report.losses} game(s).")
+
+
+def play_game(task):
+    """
+    Plays one game and returns its winner, the AI's marks, the number of
+    moves and the seconds each AI move took.
+
+    Against random moves, the AI plays X in even-numbered games and O in
+    odd ones; otherwise it plays both sides.
+    """
+    game, search, opponent, seed = task
+    rng = random.Random(seed * 1000003 + game)
+    if opponent == "ai":
+        ai_marks = [ttt.X, ttt.O]
+    else:
+        ai_marks = [ttt.X if game % 2 == 0 else ttt.O]
+
+    board = ttt.initial_state()
+    moves = 0
+    latencies = []
+    while not ttt.terminal(board):
+        if ttt.player(board) in ai_marks:
+            move_start = time.perf_counter()
+            move = ttt.minimax(board, search)
+            latencies.append(time.perf_counter() - move_start)
+        else:
+            move = rng.choice(sorted(ttt.actions(board)))
+        board = ttt.result(board, move)
+        moves += 1
+    return {
+        "winner": ttt.winner(board),
+        "ai_marks": ai_marks,
+        "moves": moves,
+        "latencies": latencies,
+    }
+
+
+class Report():
+    """
+    Outcomes and move timings of a set of games.
+    """
+
+    def __init__(self):
+        self.games = 0
+        self.wins = {ttt.X: 0, ttt.O: 0, None: 0}
+        self.losses = 0
+        self.moves = 0
+        self.latencies = []
+        self.seconds = 0
+
+    def add(self, game):
+        self.games += 1
+        self.wins[game["winner"]] += 1
+        if game["winner"] is not None and (
+                len(game["ai_marks"]) == 2
+                or game["winner"] not in game["ai_marks"]):
+            self.losses += 1
+        self.moves += game["moves"]
+        self.latencies.extend(game["latencies"])
+
+    def __str__(self):
+        latencies = sorted(self.latencies)
+        lines = [
+            f"{self.games} games: X won {self.wins[ttt.X]}, "
+            f"O won {self.wins[ttt.O]}, {self.wins[None]} drawn; "
+            f"AI lost {self.losses}.",
+        ]
+        if self.seconds > 0:
+            lines.append(f"{self.moves} moves in {self.seconds:.2f}s, "
+                         f"{self.moves / self.seconds:.0f} moves/s.")
+        if latencies:
+            lines.append(
+                f"AI move latency over {len(latencies)} moves: "
+                f"p50 {percentile(latencies, 50) * 1000:.3f} ms, "
+                f"p90 {percentile(latencies, 90) * 1000:.3f} ms, "
+                f"p99 {percentile(latencies, 99) * 1000:.3f} ms, "
+                f"max {latencies[-1] * 1000:.3f} ms."
+            )
+        return "\n".join(lines)
+
+
+def percentile(values, percent):
+    """
+    Returns the nearest-rank percentile of a sorted list of values.
+    """
+    if not values:
+        return 0
+    rank = max(1, -(-percent * len(values) // 100))
+    return values[rank - 1]
+
+
+if __name__ == "__main__":
+    main()
@@ -4,12 +4,42 @@ Tic Tac Toe Player
 
 import copy
 import math
-import random
+
+import bitboard
+import openingbook
 
 X = "X"
 O = "O"
 EMPTY = None
 
+# The eight rotations and reflections of the board, as maps from a cell
+# (i, j) to the cell it moves to
+SYMMETRIES = [
+    lambda i, j: (i, j),
+    lambda i, j: (j, 2 - i),
+    lambda i, j: (2 - i, 2 - j),
+    lambda i, j: (2 - j, i),
+    lambda i, j: (i, 2 - j),
+    lambda i, j: (2 - i, j),
+    lambda i, j: (j, i),
+    lambda i, j: (2 - j, 2 - i),
+]
+
+# Maps canonical board keys to their minimax value
+transposition_table = {}
+
+# Order alpha-beta tries moves in: centre, corners, then edges, as the
+# cells on more lines tend to be the stronger moves
+MOVE_ORDER = [(1, 1),
+              (0, 0), (0, 2), (2, 0), (2, 2),
+              (0, 1), (1, 0), (1, 2), (2, 1)]
+
+# Search algorithms minimax can use
+SEARCHES = ["book", "memo", "alphabeta", "bitboard", "minimax"]
+
+# Optimal move and value of every position, loaded on first use
+opening_book = None
+
 
 def initial_state():
     """
@@ -112,37 +142,77 @@ def utility(board):
             return 0
 
 
-def minimax(board):
+def minimax(board, search="memo", stats=None):
     """
     Returns the optimal action for the current player on the board.
+
+    search picks the algorithm from SEARCHES: a lookup in the solved opening
+    book, the memoized search, alpha-beta pruning with move ordering, the
+    same alpha-beta search on bitboards, or the plain max_value/min_value
+    search.
+    If a stats dictionary is given, its "nodes" entry counts the positions
+    searched.
     """
+    if search not in SEARCHES:
+        raise ValueError(f"unknown search {search}")
     if terminal(board):
         return None
 
     current_player = player(board)
 
-    # If the computer is first, randomises the move to reduce processing time.
-    if played_moves(board) == 0:
-        return (random.randint(0, 2), random.randint(0, 2))
-    else:
-        # If player is X, maximise
+    # If the computer is first, the book's move saves searching the whole
+    # game tree.
+    if search == "book" or played_moves(board) == 0:
+        return book_move(board)
+
+    if search == "alphabeta":
+        return alpha_beta(board, stats=stats)[1]
+    if search == "bitboard":
+        return bitboard.best_move(board, stats)
+    if search == "minimax":
         if current_player == X:
-            return max_value(board)[1]
-        # If player is O, minimise
-        else:
-            return min_value(board)[1]
+            return max_value(board, stats)[1]
+        return min_value(board, stats)[1]
+
+    # Each position's value is looked up once solved, so picking the move
+    # only needs the values of the boards one move ahead.
+    best_move = None
+    best_value = None
+    for action in sorted(actions(board)):
+        value = memo_value(result(board, action), stats)
+        if (best_value is None or
+                (current_player == X and value > best_value) or
+                (current_player == O and value < best_value)):
+            best_move, best_value = action, value
+    return best_move
+
+
+# Looks up the optimal move for a board in the opening book.
+def book_move(board):
+    global opening_book
+    if opening_book is None:
+        opening_book = openingbook.load()
+    return openingbook.lookup(opening_book, board)[1]
+
+
+# Counts a searched position in an optional stats dictionary.
+def count_node(stats):
+    if stats is not None:
+        stats["nodes"] = stats.get("nodes", 0) + 1
 
 
 # Finds move with maximum utility value 1.
-def max_value(board):
+def max_value(board, stats=None):
+    count_node(stats)
     v = float('-inf')
     move = ()
     if terminal(board):
         return [utility(board), None]
     for action in actions(board):
-        if min_value(result(board, action))[0] > v:
+        value = min_value(result(board, action), stats)[0]
+        if value > v:
             move = action
-        v = max(v, min_value(result(board, action))[0])
+            v = value
         # Ends loop if maximum value found.
         if v == 1:
             return [v, move]
@@ -150,16 +220,89 @@ def max_value(board):
 
 
 # Finds move with minimum utility value -1.
-def min_value(board):
+def min_value(board, stats=None):
+    count_node(stats)
     v = float('inf')
     move = ()
     if terminal(board):
         return [utility(board), None]
     for action in actions(board):
-        if max_value(result(board, action))[0] < v:
+        value = max_value(result(board, action), stats)[0]
+        if value < v:
             move = action
-        v = min(v, max_value(result(board, action))[0])
+            v = value
         # Ends loop if minimum value found.
         if v == -1:
             return [v, move]
     return [v, move]
+
+
+# Returns a key shared by a board and all its rotations and reflections.
+def canonical_key(board):
+    keys = []
+    for symmetry in SYMMETRIES:
+        cells = [EMPTY] * 9
+        for i in range(3):
+            for j in range(3):
+                k, m = symmetry(i, j)
+                cells[3 * k + m] = board[i][j]
+        keys.append("".join(cell or "." for cell in cells))
+    return min(keys)
+
+
+# Finds the minimax value of a board, solving each position only once.
+def memo_value(board, stats=None):
+    key = canonical_key(board)
+    if key in transposition_table:
+        return transposition_table[key]
+    count_node(stats)
+
+    if terminal(board):
+        value = utility(board)
+    elif player(board) == X:
+        value = -1
+        for action in actions(board):
+            value = max(value, memo_value(result(board, action), stats))
+            # Ends loop if maximum value found.
+            if value == 1:
+                break
+    else:
+        value = 1
+        for action in actions(board):
+            value = min(value, memo_value(result(board, action), stats))
+            # Ends loop if minimum value found.
+            if value == -1:
+                break
+
+    transposition_table[key] = value
+    return value
+
+
+# Returns the empty cells of a board in MOVE_ORDER.
+def ordered_actions(board):
+    return [action for action in MOVE_ORDER
+            if board[action[0]][action[1]] == EMPTY]
+
+
+# Finds [value, move] with alpha-beta pruning: alpha is the value the
+# maximising player is already sure of, beta the minimising player's.
+def alpha_beta(board, alpha=-1, beta=1, stats=None):
+    count_node(stats)
+    if terminal(board):
+        return [utility(board), None]
+
+    maximising = player(board) == X
+    v = -2 if maximising else 2
+    move = None
+    for action in ordered_actions(board):
+        value = alpha_beta(result(board, action), alpha, beta, stats)[0]
+        if (maximising and value > v) or (not maximising and value < v):
+            v, move = value, action
+        if maximising:
+            alpha = max(alpha, v)
+        else:
+            beta = min(beta, v)
+        # The other player will never allow this position.
+        if alpha >= beta:
+            break
+    return [v, move]
@@ -1,8 +1,20 @@
 import itertools
+import weakref
 
 
 class Sentence():
 
+    # Each node caches its hash and symbols, which are computed from the
+    # whole subtree below it. Once it has, it is registered as a parent of
+    # its compound parts, so a change below clears every cache above it.
+    __slots__ = ("_hash", "_symbols", "_parents", "_watching", "__weakref__")
+
+    def __init__(self):
+        self._hash = None
+        self._symbols = None
+        self._parents = None
+        self._watching = False
+
     def evaluate(self, model):
         """Evaluates the logical sentence."""
         raise Exception("nothing to evaluate")
@@ -13,8 +25,44 @@ class Sentence():
 
     def symbols(self):
         """Returns a set of all symbols in the logical sentence."""
+        if self._symbols is None:
+            self.watch_parts()
+            self._symbols = frozenset(self.find_symbols())
+        return set(self._symbols)
+
+    def find_symbols(self):
+        """Returns the symbols of the sentence, from its parts."""
         return set()
 
+    def parts(self):
+        """Returns the sentences the sentence is made of."""
+        return []
+
+    def watch_parts(self):
+        """Registers the sentence as a parent of its compound parts."""
+        if not self._watching:
+            self._watching = True
+            for part in self.parts():
+                part.add_parent(self)
+
+    def add_parent(self, parent):
+        """Makes changes to the sentence clear the caches of parent."""
+        if not isinstance(self, Symbol):
+            if self._parents is None:
+                self._parents = []
+            self._parents.append(weakref.ref(parent))
+
+    def invalidate(self):
+        """Clears the cached hash and symbols of the sentence and of every
+        sentence containing it."""
+        self._hash = None
+        self._symbols = None
+        for ref in self._parents or []:
+            parent = ref()
+            if parent is not None and (parent._hash is not None
+                                       or parent._symbols is not None):
+                parent.invalidate()
+
     @classmethod
     def validate(cls, sentence):
         if not isinstance(sentence, Sentence):
@@ -43,15 +91,19 @@ class Sentence():
 
 
 class Symbol(Sentence):
+    __slots__ = ("name",)
 
     def __init__(self, name):
+        Sentence.__init__(self)
         self.name = name
 
     def __eq__(self, other):
         return isinstance(other, Symbol) and self.name == other.name
 
     def __hash__(self):
-        return hash(("symbol", self.name))
+        if self._hash is None:
+            self._hash = hash(("symbol", self.name))
+        return self._hash
 
     def __repr__(self):
         return self.name
@@ -65,12 +117,15 @@ class Symbol(Sentence):
     def formula(self):
         return self.name
 
-    def symbols(self):
+    def find_symbols(self):
         return {self.name}
 
 
 class Not(Sentence):
+    __slots__ = ("operand",)
+
     def __init__(self, operand):
+        Sentence.__init__(self)
         Sentence.validate(operand)
         self.operand = operand
 
@@ -78,23 +133,32 @@ class Not(Sentence):
         return isinstance(other, Not) and self.operand == other.operand
 
     def __hash__(self):
-        return hash(("not", hash(self.operand)))
+        if self._hash is None:
+            self.watch_parts()
+            self._hash = hash(("not", hash(self.operand)))
+        return self._hash
 
     def __repr__(self):
         return f"Not({self.operand})"
 
+    def parts(self):
+        return [self.operand]
+
     def evaluate(self, model):
         return not self.operand.evaluate(model)
 
     def formula(self):
         return "¬" + Sentence.parenthesize(self.operand.formula())
 
-    def symbols(self):
+    def find_symbols(self):
         return self.operand.symbols()
 
 
 class And(Sentence):
+    __slots__ = ("conjuncts",)
+
     def __init__(self, *conjuncts):
+        Sentence.__init__(self)
         for conjunct in conjuncts:
             Sentence.validate(conjunct)
         self.conjuncts = list(conjuncts)
@@ -103,9 +167,12 @@ class And(Sentence):
         return isinstance(other, And) and self.conjuncts == other.conjuncts
 
     def __hash__(self):
-        return hash(
-            ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
-        )
+        if self._hash is None:
+            self.watch_parts()
+            self._hash = hash(
+                ("and", tuple(hash(conjunct) for conjunct in self.conjuncts))
+            )
+        return self._hash
 
     def __repr__(self):
         conjunctions = ", ".join(
@@ -113,10 +180,19 @@ class And(Sentence):
         )
         return f"And({conjunctions})"
 
+    def parts(self):
+        return self.conjuncts
+
     def add(self, conjunct):
         Sentence.validate(conjunct)
         self.conjuncts.append(conjunct)
 
+        # The cached hash and symbols, here and in every sentence
+        # containing this one, no longer match the conjuncts
+        if self._watching:
+            conjunct.add_parent(self)
+        self.invalidate()
+
     def evaluate(self, model):
         return all(conjunct.evaluate(model) for conjunct in self.conjuncts)
 
@@ -126,12 +202,16 @@ class And(Sentence):
         return " ∧ ".join([Sentence.parenthesize(conjunct.formula())
                            for conjunct in self.conjuncts])
 
-    def symbols(self):
-        return set.union(*[conjunct.symbols() for conjunct in self.conjuncts])
+    def find_symbols(self):
+        return set().union(*[conjunct.symbols()
+                             for conjunct in self.conjuncts])
 
 
 class Or(Sentence):
+    __slots__ = ("disjuncts",)
+
     def __init__(self, *disjuncts):
+        Sentence.__init__(self)
         for disjunct in disjuncts:
             Sentence.validate(disjunct)
         self.disjuncts = list(disjuncts)
@@ -140,14 +220,20 @@ class Or(Sentence):
         return isinstance(other, Or) and self.disjuncts == other.disjuncts
 
     def __hash__(self):
-        return hash(
-            ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
-        )
+        if self._hash is None:
+            self.watch_parts()
+            self._hash = hash(
+                ("or", tuple(hash(disjunct) for disjunct in self.disjuncts))
+            )
+        return self._hash
 
     def __repr__(self):
         disjuncts = ", ".join([str(disjunct) for disjunct in self.disjuncts])
         return f"Or({disjuncts})"
 
+    def parts(self):
+        return self.disjuncts
+
     def evaluate(self, model):
         return any(disjunct.evaluate(model) for disjunct in self.disjuncts)
 
@@ -157,12 +243,16 @@ class Or(Sentence):
         return " ∨  ".join([Sentence.parenthesize(disjunct.formula())
                             for disjunct in self.disjuncts])
 
-    def symbols(self):
-        return set.union(*[disjunct.symbols() for disjunct in self.disjuncts])
+    def find_symbols(self):
+        return set().union(*[disjunct.symbols()
+                             for disjunct in self.disjuncts])
 
 
 class Implication(Sentence):
+    __slots__ = ("antecedent", "consequent")
+
     def __init__(self, antecedent, consequent):
+        Sentence.__init__(self)
         Sentence.validate(antecedent)
         Sentence.validate(consequent)
         self.antecedent = antecedent
@@ -174,11 +264,19 @@ class Implication(Sentence):
                 and self.consequent == other.consequent)
 
     def __hash__(self):
-        return hash(("implies", hash(self.antecedent), hash(self.consequent)))
+        if self._hash is None:
+            self.watch_parts()
+            self._hash = hash(
+                ("implies", hash(self.antecedent), hash(self.consequent))
+            )
+        return self._hash
 
     def __repr__(self):
         return f"Implication({self.antecedent}, {self.consequent})"
 
+    def parts(self):
+        return [self.antecedent, self.consequent]
+
     def evaluate(self, model):
         return ((not self.antecedent.evaluate(model))
                 or self.consequent.evaluate(model))
@@ -188,12 +286,15 @@ class Implication(Sentence):
         consequent = Sentence.parenthesize(self.consequent.formula())
         return f"{antecedent} => {consequent}"
 
-    def symbols(self):
+    def find_symbols(self):
         return set.union(self.antecedent.symbols(), self.consequent.symbols())
 
 
 class Biconditional(Sentence):
+    __slots__ = ("left", "right")
+
     def __init__(self, left, right):
+        Sentence.__init__(self)
         Sentence.validate(left)
         Sentence.validate(right)
         self.left = left
@@ -205,11 +306,19 @@ class Biconditional(Sentence):
                 and self.right == other.right)
 
     def __hash__(self):
-        return hash(("biconditional", hash(self.left), hash(self.right)))
+        if self._hash is None:
+            self.watch_parts()
+            self._hash = hash(
+                ("biconditional", hash(self.left), hash(self.right))
+            )
+        return self._hash
 
     def __repr__(self):
         return f"Biconditional({self.left}, {self.right})"
 
+    def parts(self):
+        return [self.left, self.right]
+
     def evaluate(self, model):
         return ((self.left.evaluate(model)
                  and self.right.evaluate(model))
@@ -221,43 +330,470 @@ class Biconditional(Sentence):
         right = Sentence.parenthesize(str(self.right))
         return f"{left} <=> {right}"
 
-    def symbols(self):
+    def find_symbols(self):
         return set.union(self.left.symbols(), self.right.symbols())
 
 
-def model_check(knowledge, query):
-    """Checks if knowledge base entails query."""
-
-    def check_all(knowledge, query, symbols, model):
-        """Checks if knowledge base entails query, given a particular model."""
-
-        # If model has an assignment for each symbol
-        if not symbols:
+class SentenceFactory():
+    """Builds sentences, returning one shared node for all structurally
+    equal sentences.
+
+    Sentences from a factory are never copied, so they must not be
+    changed afterwards, e.g. with And.add, as every sentence sharing the
+    node would change too.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+
+    def intern(self, sentence):
+        """Returns the shared node equal to a sentence."""
+        return self.nodes.setdefault(sentence, sentence)
+
+    def Symbol(self, name):
+        return self.intern(Symbol(name))
+
+    def Not(self, operand):
+        return self.intern(Not(self.share(operand)))
+
+    def And(self, *conjuncts):
+        return self.intern(And(*[self.share(c) for c in conjuncts]))
+
+    def Or(self, *disjuncts):
+        return self.intern(Or(*[self.share(d) for d in disjuncts]))
+
+    def Implication(self, antecedent, consequent):
+        return self.intern(Implication(self.share(antecedent),
+                                       self.share(consequent)))
+
+    def Biconditional(self, left, right):
+        return self.intern(Biconditional(self.share(left),
+                                         self.share(right)))
+
+    def share(self, sentence):
+        """Returns a sentence rebuilt from shared nodes."""
+        if sentence in self.nodes:
+            return self.nodes[sentence]
+        if isinstance(sentence, Symbol):
+            return self.Symbol(sentence.name)
+        if isinstance(sentence, Not):
+            return self.Not(sentence.operand)
+        if isinstance(sentence, And):
+            return self.And(*sentence.conjuncts)
+        if isinstance(sentence, Or):
+            return self.Or(*sentence.disjuncts)
+        if isinstance(sentence, Implication):
+            return self.Implication(sentence.antecedent, sentence.consequent)
+        if isinstance(sentence, Biconditional):
+            return self.Biconditional(sentence.left, sentence.right)
+        raise TypeError(f"can't share {sentence}")
+
+
+def evaluate_shared(sentence, model, values=None):
+    """Evaluates a sentence in a model, computing each node only once.
+
+    values maps the id of each node evaluated to its value, so a node
+    shared by several parents, as a SentenceFactory builds them, is looked
+    up rather than evaluated again. Pass the same dict to evaluate more
+    sentences in the same model.
+    """
+    if values is None:
+        values = {}
+    key = id(sentence)
+    if key in values:
+        return values[key]
+
+    if isinstance(sentence, Symbol):
+        value = sentence.evaluate(model)
+    elif isinstance(sentence, Not):
+        value = not evaluate_shared(sentence.operand, model, values)
+    elif isinstance(sentence, And):
+        value = all(evaluate_shared(conjunct, model, values)
+                    for conjunct in sentence.conjuncts)
+    elif isinstance(sentence, Or):
+        value = any(evaluate_shared(disjunct, model, values)
+                    for disjunct in sentence.disjuncts)
+    elif isinstance(sentence, Implication):
+        value = (not evaluate_shared(sentence.antecedent, model, values)
+                 or evaluate_shared(sentence.consequent, model, values))
+    elif isinstance(sentence, Biconditional):
+        value = (evaluate_shared(sentence.left, model, values)
+                 == evaluate_shared(sentence.right, model, values))
+    else:
+        value = sentence.evaluate(model)
+
+    values[key] = value
+    return value
+
+
+class Program():
+    """Sentences compiled to a flat list of bitwise instructions.
+
+    Symbols are numbered by their position in names, and each instruction
+    computes one register from earlier ones, so evaluating never walks the
+    Sentence tree. A register holds one bit per model: bit m of symbol i's
+    input is whether the symbol is true in model m, so a single run
+    evaluates as many models as the inputs have bits.
+    """
+
+    def __init__(self, sentences, names=None):
+        if names is None:
+            names = sorted(set().union(*[s.symbols() for s in sentences]))
+        self.names = list(names)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.instructions = []
+        self.registers = {}
+        self.outputs = [self.emit(sentence) for sentence in sentences]
+
+    def emit(self, sentence):
+        """Appends instructions computing a sentence, returning the
+        register that holds it."""
+
+        # Equal subsentences are computed once
+        if sentence in self.registers:
+            return self.registers[sentence]
+
+        if isinstance(sentence, Symbol):
+            if sentence.name not in self.index:
+                raise Exception(f"variable {sentence.name} not in model")
+            instruction = ("symbol", self.index[sentence.name])
+        elif isinstance(sentence, Not):
+            instruction = ("not", self.emit(sentence.operand))
+        elif isinstance(sentence, And):
+            instruction = ("and", [self.emit(conjunct)
+                                   for conjunct in sentence.conjuncts])
+        elif isinstance(sentence, Or):
+            instruction = ("or", [self.emit(disjunct)
+                                  for disjunct in sentence.disjuncts])
+        elif isinstance(sentence, Implication):
+            instruction = ("implies", self.emit(sentence.antecedent),
+                           self.emit(sentence.consequent))
+        elif isinstance(sentence, Biconditional):
+            instruction = ("iff", self.emit(sentence.left),
+                           self.emit(sentence.right))
+        else:
+            raise TypeError(f"can't compile {sentence}")
+
+        self.instructions.append(instruction)
+        self.registers[sentence] = len(self.instructions) - 1
+        return self.registers[sentence]
+
+    def run(self, inputs, full):
+        """Returns the output masks for input masks of each symbol, where
+        full has a bit set for every model evaluated."""
+        registers = []
+        for op, *args in self.instructions:
+            if op == "symbol":
+                value = inputs[args[0]]
+            elif op == "not":
+                value = full ^ registers[args[0]]
+            elif op == "and":
+                value = full
+                for register in args[0]:
+                    value &= registers[register]
+            elif op == "or":
+                value = 0
+                for register in args[0]:
+                    value |= registers[register]
+            elif op == "implies":
+                value = (full ^ registers[args[0]]) | registers[args[1]]
+            else:
+                value = full ^ registers[args[0]] ^ registers[args[1]]
+            registers.append(value)
+        return [registers[output] for output in self.outputs]
 
-            # If knowledge base is true in model, then query must also be true
-            if knowledge.evaluate(model):
-                return query.evaluate(model)
-            return True
+    def evaluate(self, model):
+        """Evaluates the sentences in a single model."""
+        try:
+            inputs = [1 if model[name] else 0 for name in self.names]
+        except KeyError as e:
+            raise Exception(f"variable {e.args[0]} not in model")
+        return [bool(output) for output in self.run(inputs, 1)]
+
+    def blocks(self, size=16):
+        """Yields (inputs, full) covering every model of the symbols, up to
+        2 ** size models at a time."""
+        size = min(size, len(self.names))
+        width = 2 ** size
+        full = (1 << width) - 1
+
+        # The first symbols alternate within a block, in runs of 1, 2, 4...
+        patterns = []
+        for i in range(size):
+            run = 2 ** i
+            pattern = ((1 << run) - 1) << run
+            span = 2 * run
+            while span < width:
+                pattern |= pattern << span
+                span *= 2
+            patterns.append(pattern)
+
+        # The rest are fixed for the whole block
+        for block in range(2 ** (len(self.names) - size)):
+            yield patterns + [
+                full if block >> i & 1 else 0
+                for i in range(len(self.names) - size)
+            ], full
+
+
+class CNF():
+    """Clauses in conjunctive normal form, built by Tseitin encoding.
+
+    Variables are numbered from 1 and a literal is a variable or its
+    negation, so each clause is a list of nonzero integers. Every
+    compound subsentence gets a fresh variable constrained to be
+    equivalent to it, keeping the clauses linear in the sentence's size.
+    """
+
+    def __init__(self):
+        self.variables = {}
+        self.count = 0
+        self.clauses = []
+        self.literals = {}
+
+    def variable(self, name):
+        """Returns the variable of a symbol, numbering it if it is new."""
+        if name not in self.variables:
+            self.count += 1
+            self.variables[name] = self.count
+        return self.variables[name]
+
+    def fresh(self):
+        """Returns a new variable standing for a subsentence."""
+        self.count += 1
+        return self.count
+
+    def add(self, sentence):
+        """Adds clauses requiring a sentence to be true."""
+        if isinstance(sentence, And):
+            for conjunct in sentence.conjuncts:
+                self.add(conjunct)
+        elif isinstance(sentence, Or):
+            self.clauses.append(
+                [self.literal(disjunct) for disjunct in sentence.disjuncts]
+            )
+        elif isinstance(sentence, Implication):
+            self.clauses.append([-self.literal(sentence.antecedent),
+                                 self.literal(sentence.consequent)])
         else:
+            self.clauses.append([self.literal(sentence)])
+
+    def literal(self, sentence):
+        """Returns a literal equivalent to a sentence."""
+        if isinstance(sentence, Symbol):
+            return self.variable(sentence.name)
+        if isinstance(sentence, Not):
+            return -self.literal(sentence.operand)
+
+        # Equal subsentences share one variable
+        if sentence in self.literals:
+            return self.literals[sentence]
+
+        if isinstance(sentence, And):
+            parts = [self.literal(part) for part in sentence.conjuncts]
+            v = self.fresh()
+            self.clauses.extend([-v, part] for part in parts)
+            self.clauses.append([v] + [-part for part in parts])
+        elif isinstance(sentence, (Or, Implication)):
+            if isinstance(sentence, Or):
+                parts = [self.literal(part) for part in sentence.disjuncts]
+            else:
+                parts = [-self.literal(sentence.antecedent),
+                         self.literal(sentence.consequent)]
+            v = self.fresh()
+            self.clauses.extend([v, -part] for part in parts)
+            self.clauses.append([-v] + parts)
+        elif isinstance(sentence, Biconditional):
+            a = self.literal(sentence.left)
+            b = self.literal(sentence.right)
+            v = self.fresh()
+            self.clauses.extend([[-v, -a, b], [-v, a, -b],
+                                 [v, a, b], [v, -a, -b]])
+        else:
+            raise TypeError(f"can't encode {sentence}")
+
+        self.literals[sentence] = v
+        return v
+
+
+def satisfy(clauses, count):
+    """Returns a model of CNF clauses over variables 1 to count, as a list
+    of booleans indexed by variable, or None if they are unsatisfiable.
+
+    Uses conflict-driven clause learning: unit propagation with two
+    watched literals per clause, learning a clause from each conflict
+    and jumping back to the level where it becomes unit.
+    """
+    # values[v] is 1 if v is true, -1 if false and 0 if unassigned
+    values = [0] * (count + 1)
+    levels = [0] * (count + 1)
+    reasons = [None] * (count + 1)
+    activity = [0.0] * (count + 1)
+    phases = [-1] * (count + 1)
+    bump = 1.0
+    trail = []
+    trail_limits = []
+    watches = {}
+
+    def value(literal):
+        v = values[abs(literal)]
+        return v if literal > 0 else -v
+
+    def assign(literal, reason):
+        var = abs(literal)
+        values[var] = 1 if literal > 0 else -1
+        levels[var] = len(trail_limits)
+        reasons[var] = reason
+        trail.append(literal)
+
+    def watch(clause):
+        watches.setdefault(clause[0], []).append(clause)
+        watches.setdefault(clause[1], []).append(clause)
+
+    def propagate(head):
+        """Assigns every implied literal, returning a conflicting clause
+        if some clause becomes false."""
+        while head < len(trail):
+            false = -trail[head]
+            head += 1
+            watching = watches.get(false, [])
+            i = 0
+            while i < len(watching):
+                clause = watching[i]
+
+                # Keeping the false literal second
+                if clause[0] == false:
+                    clause[0], clause[1] = clause[1], clause[0]
+                if value(clause[0]) == 1:
+                    i += 1
+                    continue
+
+                # Moving the watch to a literal that isn't false
+                for j in range(2, len(clause)):
+                    if value(clause[j]) != -1:
+                        clause[1], clause[j] = clause[j], clause[1]
+                        watches.setdefault(clause[1], []).append(clause)
+                        watching[i] = watching[-1]
+                        watching.pop()
+                        break
+                else:
+                    if value(clause[0]) == -1:
+                        return clause
+                    assign(clause[0], clause)
+                    i += 1
+        return None
+
+    def analyze(conflict):
+        """Returns the first-UIP clause learnt from a conflict and the
+        level to jump back to."""
+        nonlocal bump
+        level = len(trail_limits)
+        learnt = [None]
+        seen = set()
+        pending = 0
+        literal = None
+        index = len(trail) - 1
+        clause = conflict
+        while True:
+            for other in clause:
+                var = abs(other)
+                if other == literal or var in seen or levels[var] == 0:
+                    continue
+                seen.add(var)
+                activity[var] += bump
+                if levels[var] == level:
+                    pending += 1
+                else:
+                    learnt.append(other)
+
+            # Walking back along the trail to the next literal involved
+            while abs(trail[index]) not in seen:
+                index -= 1
+            literal = trail[index]
+            index -= 1
+            pending -= 1
+            if pending == 0:
+                break
+            clause = reasons[abs(literal)]
+
+        learnt[0] = -literal
+        bump *= 1.05
+        if len(learnt) == 1:
+            return learnt, 0
+
+        # The literal assigned last after the UIP is watched second
+        second = max(range(1, len(learnt)),
+                     key=lambda i: levels[abs(learnt[i])])
+        learnt[1], learnt[second] = learnt[second], learnt[1]
+        return learnt, levels[abs(learnt[1])]
+
+    def backjump(level):
+        while len(trail_limits) > level:
+            start = trail_limits.pop()
+            while len(trail) > start:
+                var = abs(trail.pop())
+                phases[var] = values[var]
+                values[var] = 0
+                reasons[var] = None
+
+    # Simplifying the clauses and assigning units before searching
+    for clause in clauses:
+        clause = list(dict.fromkeys(clause))
+        if any(-literal in clause for literal in clause):
+            continue
+        if not clause:
+            return None
+        if len(clause) == 1:
+            if value(clause[0]) == -1:
+                return None
+            if value(clause[0]) == 0:
+                assign(clause[0], None)
+        else:
+            watch(clause)
+
+    head = 0
+    while True:
+        conflict = propagate(head)
+        head = len(trail)
+        if conflict is not None:
+            if not trail_limits:
+                return None
+            learnt, level = analyze(conflict)
+            backjump(level)
+            if len(learnt) > 1:
+                watch(learnt)
+            assign(learnt[0], learnt if len(learnt) > 1 else None)
+            head = len(trail) - 1
+            continue
+
+        # Deciding on the most active unassigned variable
+        unassigned = [var for var in range(1, count + 1) if not values[var]]
+        if not unassigned:
+            return [None] + [value == 1 for value in values[1:]]
+        var = max(unassigned, key=lambda var: activity[var])
+        trail_limits.append(len(trail))
+        assign(var * phases[var], None)
+        head = len(trail) - 1
 
-            # Choose one of the remaining unused symbols
-            remaining = symbols.copy()
-            p = remaining.pop()
 
-            # Create a model where the symbol is true
-            model_true = model.copy()
-            model_true[p] = True
+def model_check(knowledge, query):
+    """Checks if knowledge base entails query."""
 
-            # Create a model where the symbol is false
-            model_false = model.copy()
-            model_false[p] = False
+    # The knowledge entails the query if no model makes the knowledge
+    # true and the query false
+    cnf = CNF()
+    cnf.add(knowledge)
+    cnf.add(Not(query))
+    return satisfy(cnf.clauses, cnf.count) is None
 
-            # Ensure entailment holds in both models
-            return (check_all(knowledge, query, remaining, model_true) and
-                    check_all(knowledge, query, remaining, model_false))
 
-    # Get all symbols in both knowledge and query
-    symbols = set.union(knowledge.symbols(), query.symbols())
+def truth_table_check(knowledge, query):
+    """Checks if knowledge base entails query by evaluating every model."""
 
-    # Check that knowledge entails query
-    return check_all(knowledge, query, symbols, dict())
+    # Models are checked 2 ** 16 at a time, one bit each
+    program = Program([knowledge, query])
+    for inputs, full in program.blocks():
+        knowledge_true, query_true = program.run(inputs, full)
+        if knowledge_true & (full ^ query_true):
+            return False
+    return True